@@ -5,11 +5,31 @@
 
     Implements UI functionality for lantz using Qt.
 
+    Submodules are imported on first access to the names they provide,
+    so that tools that only need, for example, `wrap_driver_cls` do not
+    pay for the import of all widgets.
+
     :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
     :license: BSD, see LICENSE for more details.
 """
 
+from .utils.startup import lazy_attributes
+
+#: Dict[name, submodule] providing each public name.
+_LAZY = {'start_test_app': '.app',
+         'start_gui': '.app',
+         'start_gui_app': '.app',
+         'Backend': '.app',
+         'Frontend': '.app',
+         'InstrumentSlot': '.app',
+         'wrap_driver_cls': '.objwrapper',
+         'QtCore': '.utils.qt',
+         'QtGui': '.utils.qt',
+         'SuperQObject': '.utils.qt',
+         'MetaQObject': '.utils.qt',
+         }
+
+__all__ = list(_LAZY)
+
 
-from .app import start_test_app, start_gui, start_gui_app, Backend, Frontend, InstrumentSlot
-from .objwrapper import wrap_driver_cls
-from .utils.qt import QtCore, QtGui, SuperQObject, MetaQObject
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY)
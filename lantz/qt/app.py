@@ -64,6 +64,8 @@ from .connect import connect_setup, connect_driver, connect_feat
 from .widgets import DriverTestWidget, SetupTestWidget
 from .objwrapper import QDriver
 from .utils.qt import QtCore, QtGui, SuperQObject, MetaQObject
+from .utils import uicache
+from .utils.uicache import load_ui
 from .log import get_logger, LOGGER
 
 
@@ -243,6 +245,36 @@ class _FrontendType(MetaQObject):
         return cls.__name__
 
 
+#: Dict[(Frontend class, gui), str] the gui file of each Frontend class.
+_GUI_FILES = {}
+
+
+def _find_gui_file(cls, gui):
+    """Return the path of the gui file of a Frontend class,
+    searching the directories of the classes in its MRO.
+    The result is cached for each class.
+    """
+    key = (cls, gui)
+    filename = _GUI_FILES.get(key)
+    if filename is not None:
+        return filename
+
+    for klass in cls.__mro__:
+        if klass is object:
+            raise ValueError('{}: loading gui file {}, reached object parent'.format(cls, gui))
+
+        filename = os.path.dirname(inspect.getfile(klass))
+        if isinstance(gui, tuple):
+            filename = os.path.join(filename, *gui)
+        else:
+            filename = os.path.join(filename, gui)
+        if os.path.exists(filename):
+            _GUI_FILES[key] = filename
+            return filename
+
+    raise ValueError('{}: loading gui file {}'.format(cls, gui))
+
+
 class Frontend(LogMixin, ThreadLogMixin, QtGui.QMainWindow, metaclass=_FrontendType):
 
     logger_name = None
@@ -265,26 +297,28 @@ class Frontend(LogMixin, ThreadLogMixin, QtGui.QMainWindow, metaclass=_FrontendT
             self.logger_name = 'lantz.qt.frontend.' + str(self)
 
         if self.gui:
-            for cls in self.__class__.__mro__:
-                if cls is object:
-                    raise ValueError('{}: loading gui file {}, reached object parent'.format(self, self.gui))
-
-                filename = os.path.dirname(inspect.getfile(cls))
-                if isinstance(self.gui, tuple):
-                    filename = os.path.join(filename, *self.gui)
+            filename = _find_gui_file(self.__class__, self.gui)
+            ui_type = uicache.ui_type(filename)
+
+            if ui_type is None:
+                self.log_debug('loading gui file {} in Main Window'.format(filename))
+                self.widget = QtGui.loadUi(filename)
+                if isinstance(self.widget, QtGui.QMainWindow):
+                    self.log_debug('reloading gui file {} AS Main Window'.format(filename))
+                    self.widget = QtGui.loadUi(filename, self)
                 else:
-                    filename = os.path.join(filename, self.gui)
-                if os.path.exists(filename):
-                    self.log_debug('loading gui file {} in Main Window'.format(filename))
-                    self.widget = QtGui.loadUi(filename)
-                    if isinstance(self.widget, QtGui.QMainWindow):
-                        self.log_debug('reloading gui file {} AS Main Window'.format(filename))
-                        self.widget = QtGui.loadUi(filename, self)
-                    else:
-                        self.setCentralWidget(self.widget)
-                    break
+                    self.setCentralWidget(self.widget)
+
+            elif issubclass(ui_type[1], QtGui.QMainWindow):
+                # The top level class is known before building the widgets,
+                # so the file is loaded only once.
+                self.log_debug('loading compiled gui file {} AS Main Window'.format(filename))
+                self.widget = load_ui(filename, self)
+
             else:
-                raise ValueError('{}: loading gui file {}'.format(self, self.gui))
+                self.log_debug('loading compiled gui file {} in Main Window'.format(filename))
+                self.widget = load_ui(filename)
+                self.setCentralWidget(self.widget)
 
         # Iterate over all frontend items in the current frontend
         # and instantiate each of them.
@@ -5,14 +5,35 @@
 
     Building blocks for rich applications.
 
+    Each block module (and its dependencies, e.g. pyqtgraph for the chart)
+    is imported on first access to the names it provides.
+
     :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
     :license: BSD, see LICENSE for more details.
 """
 
-from .loop import Loop, LoopUi
-from .scan import Scan, ScanUi
-from .feat import Feat, FeatUi
-from .featscan import FeatScan, FeatScanUi
-from .chart import ChartUi
-from .layouts import HorizonalUi, VerticalUi, ToolbarLeftRightUi
-from .wlayout import BorderUi
\ No newline at end of file
+from ..utils.startup import lazy_attributes
+
+#: Dict[name, submodule] providing each public name.
+_LAZY = {'Loop': '.loop',
+         'LoopUi': '.loop',
+         'Scan': '.scan',
+         'ScanUi': '.scan',
+         'Feat': '.feat',
+         'FeatUi': '.feat',
+         'FeatScan': '.featscan',
+         'FeatScanUi': '.featscan',
+         'NDScan': '.ndscan',
+         'NDScanUi': '.ndscan',
+         'ScanAxis': '.ndscan',
+         'ChartUi': '.chart',
+         'HorizonalUi': '.layouts',
+         'VerticalUi': '.layouts',
+         'ToolbarLeftRightUi': '.layouts',
+         'BorderUi': '.wlayout',
+         }
+
+__all__ = list(_LAZY)
+
+
+__getattr__, __dir__ = lazy_attributes(__name__, _LAZY)
@@ -9,17 +9,28 @@
     :license: BSD, see LICENSE for more details.
 """
 
+import time
+
+import numpy as np
+
 from lantz.core import Q_
 
 # Import Qt modules from lantz (pyside and pyqt compatible)
-from ..utils.qt import QtGui
+from ..utils.qt import QtCore, QtGui
+from ..utils.buffers import RingBuffer, MinMaxPyramid
+from ..utils.recorder import Recorder
 
 # These classes simplify application development
 from ..app import Frontend
 
 
 class ChartUi(Frontend):
-    """A frontend with a x,y plot (powered by pyqtgraph)"""
+    """A frontend with a x,y plot (powered by pyqtgraph).
+
+    Multiple named curves can share the x axis. All of them are stored
+    in a single columnar buffer (x in column 0, one column per curve)
+    and are redrawn together.
+    """
 
     # a declarative way to indicate the user interface file to use.
     # The file must be located next to the python file where this class
@@ -29,15 +40,80 @@ class ChartUi(Frontend):
     # connect widgets to instruments using connect_setup automatically.
     auto_connect = True
 
+    #: Maximum number of points to keep. Older points are discarded.
+    #: If None, the storage grows (in chunks) without bound.
+    #: :type: int or None
+    capacity = None
+
+    #: Names of the curves sharing the x axis.
+    #: If empty, a single curve named 'y' is created.
+    #: :type: tuple of str
+    curve_names = ()
+
+    #: Maximum number of redraws per second. New points mark the plot as
+    #: dirty and the curve is repainted by a timer.
+    #: If 0 or None, the plot is redrawn on every new point.
+    #: :type: int or None
+    max_fps = 30
+
+    #: If True, long traces are drawn from a min/max pyramid choosing
+    #: the level of detail that matches the visible x range and the
+    #: width of the plot (in pixels).
+    #: :type: bool
+    decimation = True
+
+    #: Number of items of a pyramid level summarized in the next level.
+    #: :type: int
+    decimation_factor = 4
+
     _axis = {'x': 'bottom',
              'y': 'left'}
 
-    def __init__(self, xlabel='', xunits='', ylabel='', yunits='', *args, **kwargs):
+    def __init__(self, xlabel='', xunits='', ylabel='', yunits='', *args,
+                 capacity=None, curve_names=None, **kwargs):
         self._labels = {'x': xlabel, 'y': ylabel}
         self._units = {'x': xunits, 'y': yunits}
 
-        self._x = []
-        self._y = []
+        if capacity is not None:
+            self.capacity = capacity
+
+        if curve_names is not None:
+            self.curve_names = tuple(curve_names)
+        elif not self.curve_names:
+            self.curve_names = ('y', )
+
+        #: x values stored in column 0, followed by one column per curve.
+        self._data = RingBuffer(1 + len(self.curve_names), self.capacity)
+
+        #: Min/max summary of the data, updated before each redraw.
+        if self.decimation:
+            self._pyramid = MinMaxPyramid(len(self.curve_names), self.capacity, self.decimation_factor)
+        else:
+            self._pyramid = None
+
+        #: Number of rows (of self._data.total) added to the pyramid.
+        self._pyramid_total = 0
+
+        #: (level, start, stop) used in the last redraw.
+        self._lod_key = None
+
+        #: Recorder where every point added is also written.
+        #: See start_recording.
+        self.recorder = None
+
+        #: Cached (scale, offset) to convert from a given unit to the axis unit.
+        #: Dict[str, Dict[units, (float, float)]]
+        self._converters = {'x': {}, 'y': {}}
+
+        #: True if there is data not yet handed to the curve.
+        self._dirty = False
+
+        #: Redraw statistics.
+        self._frames = 0
+        self._dropped_frames = 0
+        self._render_time = 0.
+        self._last_render_time = 0.
+        self._max_render_time = 0.
 
         super().__init__(*args, **kwargs)
 
@@ -106,6 +182,43 @@ class ChartUi(Frontend):
         if units:
             setattr(self, '_q' + axis, Q_(1, units))
 
+        self._converters[axis].clear()
+
+    def _converter(self, axis, units):
+        """Return the (scale, offset) pair that converts a magnitude
+        in `units` to the units of the given axis.
+
+        Conversions are affine (this also covers offset units such as degC)
+        and are computed with pint only once per unit.
+        """
+        cache = self._converters[axis]
+        try:
+            return cache[units]
+        except KeyError:
+            pass
+
+        target = self._units[axis]
+        if units is None or not target:
+            scale, offset = 1., 0.
+        else:
+            offset = Q_(0., units).to(target).m
+            scale = Q_(1., units).to(target).m - offset
+
+        cache[units] = scale, offset
+        return scale, offset
+
+    def _to_magnitude(self, axis, value, units=None):
+        """Convert a Quantity (scalar or array valued) or a plain number/array
+        in the given units to a magnitude (or ndarray) in the units of the axis.
+        """
+        if isinstance(value, Q_):
+            value, units = value.magnitude, value.units
+
+        scale, offset = self._converter(axis, units)
+        if scale == 1. and offset == 0.:
+            return value
+        return np.multiply(value, scale) + offset
+
     def setupUi(self):
         import pyqtgraph as pg
 
@@ -114,22 +227,299 @@ class ChartUi(Frontend):
         # to customize gui building. In this case, we are adding a plot widget.
         self.pw = pg.PlotWidget()
 
-        self.curve = self.pw.plot(pen='y')
+        #: Dict[str, PlotDataItem] curves by name.
+        self.curves = {}
+        if len(self.curve_names) == 1:
+            self.curves[self.curve_names[0]] = self.pw.plot(pen='y')
+        else:
+            self.pw.addLegend()
+            count = len(self.curve_names)
+            for ndx, name in enumerate(self.curve_names):
+                self.curves[name] = self.pw.plot(pen=pg.intColor(ndx, count), name=name)
+
+        #: The first curve.
+        self.curve = self.curves[self.curve_names[0]]
+
         layout = QtGui.QVBoxLayout()
         layout.addWidget(self.pw)
         self.widget.placeholder.setLayout(layout)
 
+        self._redraw_timer = QtCore.QTimer(self)
+        if self.max_fps:
+            self._redraw_timer.setInterval(int(1000 / self.max_fps))
+        self._redraw_timer.timeout.connect(self._on_redraw_timer)
+
+        view_box = self.pw.getViewBox()
+        view_box.sigXRangeChanged.connect(self._on_view_changed)
+        view_box.sigResized.connect(self._on_view_changed)
+
+    def connect_backend(self):
+        super().connect_backend()
+
+        # Pending points are drawn (and recorded) as soon as a Loop/Scan backend is done.
+        loop_done = getattr(self.backend, 'loop_done', None)
+        if loop_done is not None:
+            loop_done.connect(self.flush)
+
+    def _y_columns(self, ys, units=None):
+        """Convert y values to an array with one row per curve.
+
+        Parameters
+        ----------
+        ys : scalar, array like, Quantity or dict
+            for a single curve, the value(s) of that curve.
+            For multiple curves, a sequence with one element per curve
+            or a dict mapping curve name to value(s). Missing curves are
+            filled with NaN.
+        units : str or Unit
+            units of ys if not a Quantity. (Default value = None)
+        """
+        count = len(self.curve_names)
+
+        if isinstance(ys, dict):
+            unknown = set(ys.keys()) - set(self.curve_names)
+            if unknown:
+                raise KeyError('Unknown curves {}, valid names are {}'.format(unknown, self.curve_names))
+            values = [self._to_magnitude('y', ys[name], units) if name in ys else np.nan
+                      for name in self.curve_names]
+            return np.array(np.broadcast_arrays(*values), dtype=float).reshape(count, -1)
+
+        if isinstance(ys, (list, tuple)):
+            # Elements may be Quantities, possibly in different units.
+            values = [self._to_magnitude('y', value, units) for value in ys]
+            ys = np.array(np.broadcast_arrays(*values), dtype=float) if values else np.empty(0)
+        else:
+            ys = np.asarray(self._to_magnitude('y', ys, units), dtype=float)
+
+        if count == 1:
+            return ys.reshape(1, -1)
+
+        if not ys.ndim or ys.shape[0] != count:
+            raise ValueError('Expected values for {} curves, got {}'.format(count, ys.shape))
+
+        return ys.reshape(count, -1)
+
     def plot(self, x, y):
-        """Add a pair of points to the plot.
+        """Add a point to the plot.
+
+        Parameters
+        ----------
+        x : Quantity or number
+            x value.
+        y : Quantity, number, sequence or dict
+            y value for a single curve. For multiple curves, a sequence with
+            one value per curve or a dict mapping curve name to value.
+        """
+        x = self._to_magnitude('x', x)
+        row = np.concatenate(([x], self._y_columns(y)[:, 0]))
+        self._data.append(row)
+        if self.recorder is not None:
+            self.recorder.extend(row)
+        self._schedule_redraw()
+
+    def plot_many(self, xs, ys, xunits=None, yunits=None):
+        """Add multiple points to the plot at once.
+
+        Parameters
+        ----------
+        xs : Quantity or array like
+            x values. Either an array valued Quantity or an array of
+            magnitudes in `xunits`.
+        ys : Quantity, array like or dict
+            y values. Either an array valued Quantity or an array of
+            magnitudes in `yunits`. For multiple curves, an array of shape
+            (curves, n) or a dict mapping curve name to values.
+        xunits : str or Unit
+            units of xs if not a Quantity.
+            If None, values are taken to be in the x-axis units. (Default value = None)
+        yunits : str or Unit
+            units of ys if not a Quantity.
+            If None, values are taken to be in the y-axis units. (Default value = None)
+        """
+        xs = np.asarray(self._to_magnitude('x', xs, xunits), dtype=float)
+        xs, ys = np.broadcast_arrays(xs[np.newaxis], self._y_columns(ys, yunits))
+        rows = np.vstack((xs[:1], ys))
+        self._data.extend(rows)
+        if self.recorder is not None:
+            self.recorder.extend(rows)
+        self._schedule_redraw()
+
+    def extend(self, xs, ys, xunits=None, yunits=None):
+        """Add multiple points to the plot at once. Same as plot_many.
+        """
+        self.plot_many(xs, ys, xunits, yunits)
+
+    def _schedule_redraw(self):
+        """Mark the plot as dirty and make sure that a redraw is scheduled.
+        """
+        if not self.max_fps:
+            self._redraw()
+            return
+
+        if self._dirty:
+            # This update will be shown together with the previous ones.
+            self._dropped_frames += 1
+            return
+
+        self._dirty = True
+        if not self._redraw_timer.isActive():
+            self._redraw_timer.start()
+
+    def _on_redraw_timer(self):
+        if self._dirty:
+            self._redraw()
+        else:
+            self._redraw_timer.stop()
+
+    def _on_view_changed(self, *args):
+        """Redraw if the level of detail changes due to zoom, pan or resize.
+        """
+        if self._pyramid is not None and self._lod() != self._lod_key:
+            self._schedule_redraw()
+
+    def _update_pyramid(self):
+        """Add to the pyramid the rows appended since the last redraw.
+        """
+        new = self._data.total - self._pyramid_total
+        if not new:
+            return
+        if new > len(self._data):
+            # Some rows were discarded before being summarized.
+            new = len(self._data)
+        self._pyramid.extend(self._data.view()[:, -new:])
+        self._pyramid_total = self._data.total
+
+    def _visible_range(self):
+        """Return the visible x range (with a margin for panning)
+        or None if all the data is shown.
+        """
+        view_box = self.pw.getViewBox()
+        if view_box.autoRangeEnabled()[0]:
+            return None
+        x0, x1 = view_box.viewRange()[0]
+        margin = (x1 - x0) / 2
+        return x0 - margin, x1 + margin
+
+    def _lod(self):
+        """Return the level of detail and the slice of the raw data
+        to draw as a tuple (level, start, stop).
+        """
+        start, stop = 0, len(self._data)
+        if self._pyramid is None:
+            return 0, start, stop
+
+        if self._pyramid.monotonic:
+            x_range = self._visible_range()
+            if x_range is not None:
+                x = self._data.column(0)
+                start = int(np.searchsorted(x, x_range[0], 'left'))
+                stop = int(np.searchsorted(x, x_range[1], 'right'))
+
+        width = int(self.pw.getViewBox().width()) or 1000
+        return self._pyramid.level_for(stop - start, width), start, stop
+
+    def _curve_data(self, column):
+        """Return the x and y arrays to draw for a given column.
+
+        At full detail these are views of the buffer, so no data is copied.
+        """
+        level, start, stop = self._lod_key
+        if level:
+            return self._pyramid.points(level, column - 1, self._visible_range())
+        return self._data.column(0)[start:stop], self._data.column(column)[start:stop]
+
+    def _redraw(self):
+        """Hand the stored data to the curve.
+        """
+        st = time.perf_counter()
+        if self._pyramid is not None:
+            self._update_pyramid()
+        self._lod_key = self._lod()
+
+        # Repaint all curves at once.
+        self.pw.setUpdatesEnabled(False)
+        try:
+            for column, name in enumerate(self.curve_names, 1):
+                self.curves[name].setData(*self._curve_data(column))
+        finally:
+            self.pw.setUpdatesEnabled(True)
+
+        elapsed = time.perf_counter() - st
+
+        self._dirty = False
+        self._frames += 1
+        self._last_render_time = elapsed
+        self._render_time += elapsed
+        self._max_render_time = max(self._max_render_time, elapsed)
+
+    def flush(self, *args):
+        """Redraw now if there are pending points.
+        Also write pending points to the recording.
+        """
+        self._redraw_timer.stop()
+        if self._dirty:
+            self._redraw()
+        if self.recorder is not None:
+            self.recorder.request_flush()
+
+    @property
+    def render_stats(self):
+        """Redraw statistics as a dict.
+
+        - frames: number of redraws.
+        - dropped_frames: number of updates merged into a later redraw.
+        - last_render_time, mean_render_time, max_render_time: in seconds.
+        """
+        return {'frames': self._frames,
+                'dropped_frames': self._dropped_frames,
+                'last_render_time': self._last_render_time,
+                'mean_render_time': self._render_time / self._frames if self._frames else 0.,
+                'max_render_time': self._max_render_time}
+
+    def reset_render_stats(self):
+        """Reset redraw statistics.
+        """
+        self._frames = 0
+        self._dropped_frames = 0
+        self._render_time = 0.
+        self._last_render_time = 0.
+        self._max_render_time = 0.
+
+    def start_recording(self, filename, flush_interval=1.):
+        """Write every point added to the chart to a file,
+        in the units of the axes. Points are kept even if the plot is cleared.
+
+        See :mod:`lantz.qt.utils.recorder` for the file format.
+
+        Parameters
+        ----------
+        filename : str
+            path of the recording.
+        flush_interval : float
+            seconds between flushes to disk. (Default value = 1.)
+
+        Returns
+        -------
+        Recorder
+        """
+        self.stop_recording()
+        columns = (self._labels['x'] or 'x', ) + tuple(self.curve_names)
+        units = (self._units['x'], ) + (self._units['y'], ) * len(self.curve_names)
+        self.recorder = Recorder(filename, columns, units, flush_interval)
+        return self.recorder
+
+    def stop_recording(self):
+        """Flush and close the current recording (if any).
         """
-        x = x.to(self._qx).m
-        y = y.to(self._qy).m
-        self._x.append(x)
-        self._y.append(y)
-        self.curve.setData(self._x, self._y)
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
 
     def clear(self, *args):
         """Clear the plot.
         """
-        self._x.clear()
-        self._y.clear()
+        self._data.clear()
+        if self._pyramid is not None:
+            self._pyramid.clear()
+            self._pyramid_total = 0
+        self._schedule_redraw()
@@ -11,10 +11,14 @@
 
 import time
 import math
+import threading
 from enum import IntEnum
 
 from ..utils.qt import QtCore, QtGui
 from ..app import Frontend, Backend, start_gui_app
+from ..utils.recorder import RecordingMixin
+from ..utils.timing import LoopTiming, wait_until
+from ..utils.telemetry import IterationTelemetry, format_summary
 
 
 class StopMode(IntEnum):
@@ -24,7 +28,30 @@ class StopMode(IntEnum):
     IterationsTimeOut = 3
 
 
-class Loop(Backend):
+class Scheduling(IntEnum):
+    #: The next iteration is scheduled `interval` after the start of the
+    #: current one with a coarse Qt timer. Errors accumulate.
+    Relative = 0
+
+    #: Iterations are scheduled at absolute deadlines (start + n * interval)
+    #: with a precise Qt timer. Errors do not accumulate.
+    Absolute = 1
+
+    #: Iterations run in a dedicated thread waiting for absolute deadlines,
+    #: sleeping and then busy waiting for the last `spin_threshold` seconds.
+    #: The body is called from that thread.
+    Thread = 2
+
+    #: Iterations run back to back in a while loop in the backend thread.
+    #: Pending events are processed (and `stop` is honoured) only every
+    #: `burst_check_iterations` iterations or `burst_check_interval` seconds.
+    #: The iteration signal, timing and telemetry are only produced for
+    #: the iterations at these check points.
+    #: Only used if interval is 0, otherwise Absolute is used.
+    Burst = 3
+
+
+class Loop(RecordingMixin, Backend):
     """The Loop backend allows you to execute task periodically.
     
     Usage:
@@ -58,6 +85,36 @@ class Loop(Backend):
     #: The parameter is used to inform if the loop was canceled.
     loop_done = QtCore.Signal(bool)
 
+    #: Signal emitted periodically (every `timing_update_interval` seconds)
+    #: and when the loop finishes with the timing statistics
+    #: (see LoopTiming.to_dict).
+    timing_updated = QtCore.Signal(object)
+
+    #: Signal emitted together with timing_updated with the summary
+    #: of the per iteration telemetry (see IterationTelemetry.summary).
+    telemetry_updated = QtCore.Signal(object)
+
+    #: How iterations are scheduled. See Scheduling.
+    scheduling = Scheduling.Relative
+
+    #: In Scheduling.Thread, remaining time (in seconds) below which
+    #: the loop thread busy waits instead of sleeping.
+    spin_threshold = 2e-3
+
+    #: Minimum time in seconds between timing_updated signals.
+    timing_update_interval = .5
+
+    #: Number of iterations kept in the telemetry buffer.
+    telemetry_capacity = 10000
+
+    #: In Scheduling.Burst, maximum number of iterations
+    #: between checks for pending events.
+    burst_check_iterations = 1000
+
+    #: In Scheduling.Burst, maximum time in seconds
+    #: between checks for pending events.
+    burst_check_interval = 20e-3
+
     #: The function to be called. It requires three parameters.
     #:   counter - the iteration number
     #:   iterations - total number of iterations
@@ -71,6 +128,16 @@ class Loop(Backend):
         self._active = False
         self._internal_func = None
 
+        #: Timing statistics (LoopTiming) of the current or last loop.
+        self.timing = None
+        self._timing_emitted = 0.
+
+        #: Per iteration timing (IterationTelemetry) of the current or last loop.
+        self.telemetry = IterationTelemetry(self.telemetry_capacity)
+
+        self._stop_event = threading.Event()
+        self._thread = None
+
     def stop(self):
         """Request the scanning to be stop.
         Will stop when the current iteration is finished.
@@ -83,8 +150,39 @@ class Loop(Backend):
 
         """
         self._active = False
+        self._stop_event.set()
+
+    def _run_iteration(self, body, counter, iterations, overrun, scheduled):
+        """Run an iteration recording its timing.
 
-    def start(self, body, interval=0, iterations=0, timeout=0):
+        Returns
+        -------
+        (float, float)
+            perf_counter at the start and at the end of the iteration.
+        """
+        perf_counter = time.perf_counter
+
+        st = perf_counter()
+        self.timing.iteration_started(counter, st)
+        self.iteration.emit(counter, iterations, overrun)
+        dispatched = perf_counter()
+        body(counter, iterations, overrun)
+        now = perf_counter()
+
+        self.telemetry.add(counter, st, st - scheduled, dispatched - st,
+                           math.nan, now - dispatched, math.nan, now - st)
+        return st, now
+
+    def _iteration_finished(self, duration, force=False):
+        timing = self.timing
+        timing.iteration_finished(duration)
+        now = time.perf_counter()
+        if force or now - self._timing_emitted > self.timing_update_interval:
+            self._timing_emitted = now
+            self.timing_updated.emit(timing.to_dict())
+            self.telemetry_updated.emit(self.telemetry.summary())
+
+    def start(self, body, interval=0, iterations=0, timeout=0, scheduling=None):
         """Request the scanning to be started.
 
         Parameters
@@ -102,39 +200,182 @@ class Loop(Backend):
             total time in seconds that the scanning will take.
             If overdue, the scanning will be stopped.
             If 0, there is no timeout. (Default value = 0)
+        scheduling : Scheduling
+            how iterations are scheduled.
+            If None, the class attribute is used. (Default value = None)
 
         Returns
         -------
 
         """
         self._active = True
+        self._stop_event.clear()
         body = body or self.body
+        scheduling = self.scheduling if scheduling is None else Scheduling(scheduling)
+
+        self.timing = LoopTiming(interval)
+        self.telemetry.clear()
+        self._timing_emitted = 0.
+
+        if timeout:
+            QtCore.QTimer.singleShot(int(timeout * 1000), self.stop)
+
+        if scheduling == Scheduling.Burst:
+            if not interval:
+                scheduled = time.perf_counter()
+                QtCore.QTimer.singleShot(0, lambda: self._run_burst(body, iterations, scheduled))
+                return
+            scheduling = Scheduling.Absolute
+
+        if scheduling == Scheduling.Thread:
+            self._thread = threading.Thread(target=self._run_thread,
+                                            args=(body, interval, iterations),
+                                            name='lantz-loop')
+            self._thread.daemon = True
+            self._thread.start()
+            return
+
+        if scheduling == Scheduling.Absolute:
+            self._internal_func = self._absolute_scheduler(body, interval, iterations)
+        else:
+            self._internal_func = self._relative_scheduler(body, interval, iterations)
+
+        scheduled = time.perf_counter()
+        QtCore.QTimer.singleShot(0, lambda: self._internal_func(0, scheduled=scheduled))
+
+    def _finish(self, counter, iterations, duration):
+        """Emit loop_done if the loop is over.
+
+        Returns
+        -------
+        bool
+            True if the loop is over.
+        """
+        if iterations and counter + 1 == iterations:
+            self._active = False
+            self._iteration_finished(duration, True)
+            self.loop_done.emit(False)
+            return True
+        elif not self._active:
+            self._iteration_finished(duration, True)
+            self.loop_done.emit(True)
+            return True
+
+        self._iteration_finished(duration)
+        return False
+
+    def _relative_scheduler(self, body, interval, iterations):
+
+        def internal(counter, overrun=False, scheduled=None, schedule=QtCore.QTimer.singleShot):
+            if not self._active:
+                self.loop_done.emit(True)
+                return
+
+            st, now = self._run_iteration(body, counter, iterations, overrun, scheduled)
+
+            duration = now - st
+            if self._finish(counter, iterations, duration):
+                return
+
+            sleep = interval - duration
+            next_scheduled = now + max(sleep, 0)
+            schedule(int(sleep * 1000) if sleep > 0 else 0,
+                     lambda: self._internal_func(counter + 1, sleep < 0, next_scheduled))
+
+        return internal
 
-        def internal(counter, overrun=False, schedule=QtCore.QTimer.singleShot):
+    def _absolute_scheduler(self, body, interval, iterations):
+
+        #: Start of the slot of the first iteration.
+        origin = time.perf_counter()
+
+        def internal(counter, overrun=False, scheduled=None, slot=0):
             if not self._active:
                 self.loop_done.emit(True)
                 return
 
-            st = time.time()
-            self.iteration.emit(counter, iterations, overrun)
-            body(counter, iterations, overrun)
+            st, now = self._run_iteration(body, counter, iterations, overrun, scheduled)
 
-            if iterations and counter + 1 == iterations:
-                self._active = False
-                self.loop_done.emit(False)
+            if self._finish(counter, iterations, now - st):
                 return
-            elif not self._active:
+
+            next_slot = slot + 1
+            overrun = interval > 0 and now > origin + next_slot * interval
+            if overrun:
+                # Run immediately, in the slot that is in progress.
+                next_slot = int((now - origin) / interval)
+                delay = 0
+                next_scheduled = now
+            else:
+                next_scheduled = origin + next_slot * interval
+                delay = max(int((next_scheduled - now) * 1000), 0)
+
+            QtCore.QTimer.singleShot(delay, QtCore.Qt.PreciseTimer,
+                                     lambda: self._internal_func(counter + 1, overrun,
+                                                                 next_scheduled, next_slot))
+
+        return internal
+
+    def _run_burst(self, body, iterations, scheduled):
+        perf_counter = time.perf_counter
+        process_events = QtCore.QCoreApplication.processEvents
+        check_iterations = max(int(self.burst_check_iterations), 1)
+        check_interval = self.burst_check_interval
+        counter = 0
+
+        while True:
+            if not self._active:
                 self.loop_done.emit(True)
                 return
 
-            sleep = interval - (time.time() - st)
-            schedule(sleep * 1000 if sleep > 0 else 0,
-                     lambda: self._internal_func(counter + 1, sleep < 0))
+            # The first iteration after a check is fully instrumented.
+            st, now = self._run_iteration(body, counter, iterations, False, scheduled)
+            if self._finish(counter, iterations, now - st):
+                return
+            counter += 1
 
-        self._internal_func = internal
-        if timeout:
-            QtCore.QTimer.singleShot(timeout * 1000, self.stop)
-        QtCore.QTimer.singleShot(0, lambda: self._internal_func(0))
+            # The last iteration must also be instrumented, to emit loop_done.
+            stop = counter + check_iterations - 1
+            if iterations:
+                stop = min(stop, iterations - 1)
+            deadline = now + check_interval
+
+            while counter < stop:
+                body(counter, iterations, False)
+                counter += 1
+                if perf_counter() > deadline:
+                    break
+
+            process_events()
+            scheduled = perf_counter()
+
+    def _run_thread(self, body, interval, iterations):
+        origin = time.perf_counter()
+        slot = 0
+        counter = 0
+        overrun = False
+        spin = self.spin_threshold
+        scheduled = origin
+
+        while self._active:
+            st, now = self._run_iteration(body, counter, iterations, overrun, scheduled)
+
+            if self._finish(counter, iterations, now - st):
+                return
+
+            slot += 1
+            overrun = interval > 0 and now > origin + slot * interval
+            if overrun:
+                slot = int((now - origin) / interval)
+                scheduled = now
+            else:
+                scheduled = origin + slot * interval
+                if not wait_until(scheduled, self._stop_event, spin):
+                    break
+
+            counter += 1
+
+        self.loop_done.emit(True)
 
 
 class LoopUi(Frontend):
@@ -168,6 +409,7 @@ class LoopUi(Frontend):
 
         self.backend.iteration.connect(self.on_iteration)
         self.backend.loop_done.connect(self.on_loop_done)
+        self.backend.telemetry_updated.connect(self.on_telemetry_updated)
 
         self.request_start.connect(self.backend.start)
         self.request_stop.connect(self.backend.stop)
@@ -219,6 +461,9 @@ class LoopUi(Frontend):
         else:
             pbar.setPalette(self._ok_palette)
 
+    def on_telemetry_updated(self, summary):
+        self.widget.telemetry.setText(format_summary(summary))
+
     def on_mode_changed(self, new_index):
         if new_index == StopMode.Continuous:
             self.widget.duration.setEnabled(False)
@@ -251,8 +496,59 @@ class LoopUi(Frontend):
 
 
 if __name__ == '__main__':
-    def func(current, total, overrun):
-        print('func', current, total, overrun)
-    app = Loop()
-    app.body = func
-    start_gui_app(app, LoopUi)
+    import sys
+
+    if '--bench' in sys.argv:
+        # Compare the timing of the scheduling modes with a 5 ms interval.
+        qapp = QtCore.QCoreApplication(sys.argv)
+        modes = list(Scheduling)
+
+        def run_next(*args):
+            if not modes:
+                qapp.quit()
+                return
+            mode = modes.pop(0)
+            print(mode.name)
+            loop.start(lambda *args: None, interval=5e-3, iterations=400, scheduling=mode)
+
+        def show(cancelled):
+            stats = loop.timing.to_dict()
+            for name in ('jitter', 'drift', 'overrun'):
+                hist = stats['histograms'][name]
+                print('  {:8s} mean {:+9.1f} us  max {}'.format(
+                    name, hist['mean'] * 1e6,
+                    '-' if hist['max'] is None else '{:+.1f} us'.format(hist['max'] * 1e6)))
+            QtCore.QTimer.singleShot(0, run_next)
+
+        loop = Loop()
+        loop.loop_done.connect(show)
+        QtCore.QTimer.singleShot(0, run_next)
+        qapp.exec_()
+    elif '--bench-burst' in sys.argv:
+        # Compare the throughput of an empty body with interval 0.
+        qapp = QtCore.QCoreApplication(sys.argv)
+        runs = [(Scheduling.Relative, 10000), (Scheduling.Burst, 100000)]
+
+        def run_next(*args):
+            if not runs:
+                qapp.quit()
+                return
+            mode, iterations = runs.pop(0)
+            loop.bench = mode, iterations, time.perf_counter()
+            loop.start(lambda *args: None, interval=0, iterations=iterations, scheduling=mode)
+
+        def show(cancelled):
+            mode, iterations, st = loop.bench
+            print('{:10s} {:10.0f} iterations/s'.format(mode.name, iterations / (time.perf_counter() - st)))
+            QtCore.QTimer.singleShot(0, run_next)
+
+        loop = Loop()
+        loop.loop_done.connect(show)
+        QtCore.QTimer.singleShot(0, run_next)
+        qapp.exec_()
+    else:
+        def func(current, total, overrun):
+            print('func', current, total, overrun)
+        app = Loop()
+        app.body = func
+        start_gui_app(app, LoopUi)
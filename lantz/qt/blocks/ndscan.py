@@ -0,0 +1,406 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.qt.blocks.ndscan
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    A N-dimensional Scan frontend and Backend.
+
+    Each axis sets a feat of an instrument to a sequence of steps. The
+    points of the grid are visited in C order (the last axis changes
+    fastest) or, optionally, in snake order in which the faster axes
+    reverse direction every time a slower axis moves. Snake ordering
+    avoids moving an actuator back across its whole range.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from ..utils.qt import QtCore, QtGui
+from ..app import Frontend, Backend, start_gui_app
+
+
+class ScanAxis(namedtuple('ScanAxis', 'instrument feat_name steps')):
+    """An axis of a NDScan.
+
+    Parameters
+    ----------
+    instrument : str or instrument
+        the name of an InstrumentSlot of the backend (recommended, as
+        the instrument is then moved to the backend thread) or an instrument.
+    feat_name : str
+        name of the feat that is set.
+    steps : sequence
+        values of the feat. Must support len (e.g. a list,
+        a NumPy array or LinearSteps).
+    """
+
+
+def _grid_chunk(shape, start, stop, snake):
+    """Return the indices of the points start to stop (excluded)
+    as an array of shape (len(shape), stop - start).
+    """
+    indices = np.unravel_index(np.arange(start, stop), shape)
+    if not snake:
+        return np.stack(indices)
+
+    # Axis d runs backwards when the number of sweeps it completed
+    # (the C order index of the slower axes) is odd.
+    out = np.empty((len(shape), stop - start), dtype=np.intp)
+    sweeps = np.zeros(stop - start, dtype=np.intp)
+    for axis, (length, index) in enumerate(zip(shape, indices)):
+        out[axis] = np.where(sweeps % 2, length - 1 - index, index)
+        sweeps = sweeps * length + index
+    return out
+
+
+def grid_indices(shape, snake=False, chunk_size=4096):
+    """Yield the index (a tuple of int) of each point of a grid.
+
+    Indices are calculated with NumPy in chunks, so the grid is never
+    stored as a whole.
+
+    Parameters
+    ----------
+    shape : tuple of int
+        number of steps of each axis.
+    snake : bool
+        if True, the faster axes reverse direction every time
+        a slower axis moves. (Default value = False)
+    chunk_size : int
+        number of indices calculated at once. (Default value = 4096)
+    """
+    shape = tuple(shape)
+    total = int(np.prod(shape)) if shape else 0
+    for start in range(0, total, chunk_size):
+        chunk = _grid_chunk(shape, start, min(start + chunk_size, total), snake)
+        yield from zip(*chunk.tolist())
+
+
+class NDScan(Backend):
+    """A backend that visits all points of a grid defined by several axes,
+    setting the feat of each axis that changed and calling a `body`
+    function in each point.
+
+    Usage:
+
+        class XYScan(NDScan):
+            stage = InstrumentSlot
+
+        def measure(counter, index, values, overrun):
+            return detector.intensity
+
+        app = XYScan(axes=[ScanAxis('stage', 'x', np.linspace(0, 1, 101)),
+                           ScanAxis('stage', 'y', np.linspace(0, 1, 101))],
+                     stage=inst)
+        app.body = measure
+
+        start_gui_app(app, NDScanUi)
+
+    The values returned by the body are stored in `results`,
+    an array with one element per point.
+
+    Parameters
+    ----------
+    axes : iterable of ScanAxis
+        axes of the scan, from the slowest to the fastest.
+        (Default value = ())
+    """
+
+    #: Signal emitted before starting a new iteration
+    #: Parameters: loop counter, number of points, overrun
+    iteration = QtCore.Signal(int, int, bool)
+
+    #: Signal emitted after setting the feats of a point.
+    #: Parameters: index (tuple of int), values (tuple)
+    point = QtCore.Signal(object, object)
+
+    #: Signal emitted when the body returned a value.
+    #: Parameters: index (tuple of int), value
+    point_done = QtCore.Signal(object, object)
+
+    #: Signal emitted when the loop finished.
+    #: The parameter is used to inform if the loop was canceled.
+    loop_done = QtCore.Signal(bool)
+
+    #: The function to be called. It requires four parameters.
+    #:    counter - the iteration number.
+    #:    index - tuple with the index of the point in each axis.
+    #:    values - tuple with the value of the point in each axis.
+    #:    overrun - a boolean indicating if the time required for the operation
+    #:             is longer than the interval.
+    #: If it returns a value other than None, it is stored in results.
+    #: :type: (int, tuple, tuple, bool) -> object
+    body = None
+
+    #: If True, the points are visited in snake order.
+    snake = False
+
+    #: NumPy data type of the results array (NaN marks missing points,
+    #: so it must be a float or complex type).
+    result_dtype = float
+
+    def __init__(self, axes=(), **kwargs):
+        super().__init__(**kwargs)
+        self._active = False
+        self._internal_func = None
+
+        #: Axes of the scan, from the slowest to the fastest.
+        self.axes = [ScanAxis(*axis) for axis in axes]
+
+        #: Preallocated array with the value returned by the body
+        #: in each point of the current or last scan.
+        self.results = None
+
+        #: Index of the current (or last) point.
+        self.index = None
+
+    @property
+    def shape(self):
+        """Number of steps of each axis."""
+        return tuple(len(axis.steps) for axis in self.axes)
+
+    def axis_instrument(self, axis):
+        """Return the instrument of an axis (a ScanAxis or its position)."""
+        if isinstance(axis, int):
+            axis = self.axes[axis]
+        if isinstance(axis.instrument, str):
+            return getattr(self, axis.instrument)
+        return axis.instrument
+
+    def stop(self):
+        """Request the scanning to be stop.
+        Will stop when the current iteration is finished.
+
+        Parameters
+        ----------
+
+        Returns
+        -------
+
+        """
+        self._active = False
+
+    def _pre_body(self, counter, index, values, overrun):
+        """Set the feats of the axes that changed since the previous point,
+        from the slowest to the fastest.
+        """
+        previous = self.index
+        for ndx, (axis, value) in enumerate(zip(self.axes, values)):
+            if previous is None or previous[ndx] != index[ndx]:
+                setattr(self.axis_instrument(axis), axis.feat_name, value)
+
+    def start(self, body=None, interval=0, timeout=0, snake=None):
+        """Request the scanning to be started.
+
+        Parameters
+        ----------
+        body :
+            function to be called at each point.
+            If None, the class body will be used.
+        interval :
+            interval between starts of the iteration.
+            If the body takes too long, the iteration will
+            be as fast as possible and the overrun flag will be True (Default value = 0)
+        timeout :
+            total time in seconds that the scanning will take.
+            If overdue, the scanning will be stopped.
+            If 0, there is no timeout. (Default value = 0)
+        snake :
+            if True, the points are visited in snake order.
+            If None, the class attribute is used. (Default value = None)
+
+        Returns
+        -------
+
+        """
+        if not self.axes:
+            raise ValueError('A NDScan requires at least one axis')
+
+        self._active = True
+        body = body or self.body
+        snake = self.snake if snake is None else snake
+
+        steps = [np.asarray(axis.steps) for axis in self.axes]
+        shape = tuple(len(values) for values in steps)
+        iterations = int(np.prod(shape))
+
+        self.results = np.full(shape, np.nan, dtype=self.result_dtype)
+        self.index = None
+
+        indices = grid_indices(shape, snake)
+
+        def internal(counter, index, overrun=False, schedule=QtCore.QTimer.singleShot):
+            if not self._active:
+                self.loop_done.emit(True)
+                return
+
+            st = time.perf_counter()
+            self.iteration.emit(counter, iterations, overrun)
+
+            values = tuple(axis_steps[ndx] for axis_steps, ndx in zip(steps, index))
+            self._pre_body(counter, index, values, overrun)
+            self.index = index
+            self.point.emit(index, values)
+
+            if body is not None:
+                value = body(counter, index, values, overrun)
+                if value is not None:
+                    self.results[index] = value
+                    self.point_done.emit(index, value)
+
+            next_index = next(indices, None)
+
+            if next_index is None:
+                self._active = False
+                self.loop_done.emit(False)
+                return
+            elif not self._active:
+                self.loop_done.emit(True)
+                return
+
+            sleep = interval - (time.perf_counter() - st)
+            schedule(int(sleep * 1000) if sleep > 0 else 0,
+                     lambda: self._internal_func(counter + 1, next_index, sleep < 0))
+
+        self._internal_func = internal
+
+        first = next(indices, None)
+        if first is None:
+            self._active = False
+            QtCore.QTimer.singleShot(0, lambda: self.loop_done.emit(False))
+            return
+
+        if timeout:
+            QtCore.QTimer.singleShot(int(timeout * 1000), self.stop)
+        QtCore.QTimer.singleShot(0, lambda: self._internal_func(0, first))
+
+
+class NDScanUi(Frontend):
+    """A frontend to the NDScan backend showing the progress
+    of the whole scan and of each axis.
+    """
+
+    gui = 'placeholder.ui'
+
+    auto_connect = False
+
+    #: Signal emitted when a start is requested.
+    #: The parameters are None, interval, timeout, snake
+    request_start = QtCore.Signal(object, object, object, object)
+
+    #: Signal emitted when a stop is requested.
+    request_stop = QtCore.Signal()
+
+    def setupUi(self):
+        super().setupUi()
+
+        self.start_stop = QtGui.QPushButton('Start')
+        self.start_stop.setCheckable(True)
+
+        self.wait = QtGui.QDoubleSpinBox()
+        self.wait.setSuffix(' s')
+        self.wait.setDecimals(3)
+        self.wait.setMaximum(1e6)
+
+        self.snake = QtGui.QCheckBox('Snake order')
+
+        self.progress_bar = QtGui.QProgressBar()
+        self.progress_bar.setValue(0)
+
+        #: List[QProgressBar] one per axis.
+        self.axis_bars = []
+
+        self._axes_layout = QtGui.QFormLayout()
+        self._axes_layout.addRow('Wait', self.wait)
+        self._axes_layout.addRow('', self.snake)
+
+        layout = QtGui.QVBoxLayout()
+        layout.addLayout(self._axes_layout)
+        layout.addWidget(self.progress_bar)
+        layout.addWidget(self.start_stop)
+        self.widget.placeholder.setLayout(layout)
+
+    def connect_backend(self):
+        super().connect_backend()
+
+        for bar in self.axis_bars:
+            self._axes_layout.removeRow(bar)
+        self.axis_bars = []
+
+        for ndx, axis in enumerate(self.backend.axes):
+            bar = QtGui.QProgressBar()
+            bar.setMaximum(len(axis.steps))
+            bar.setValue(0)
+            self.axis_bars.append(bar)
+            self._axes_layout.addRow(axis.feat_name, bar)
+
+        self.snake.setChecked(bool(self.backend.snake))
+
+        self.start_stop.clicked.connect(self.on_start_stop_clicked)
+
+        self.backend.iteration.connect(self.on_iteration)
+        self.backend.point.connect(self.on_point)
+        self.backend.loop_done.connect(self.on_loop_done)
+
+        self.request_start.connect(self.backend.start)
+        self.request_stop.connect(self.backend.stop)
+
+    def on_start_stop_clicked(self, value=None):
+        if self.backend._active:
+            self.start_stop.setText('...')
+            self.start_stop.setEnabled(False)
+            self.request_stop.emit()
+            return
+
+        self.start_stop.setText('Stop')
+        self.start_stop.setChecked(True)
+
+        self.request_start.emit(None, self.wait.value(), 0, self.snake.isChecked())
+
+    def on_iteration(self, counter, iterations, overrun):
+        pbar = self.progress_bar
+        if not counter:
+            pbar.setMaximum(iterations)
+        pbar.setValue(counter + 1)
+
+    def on_point(self, index, values):
+        for bar, ndx, value in zip(self.axis_bars, index, values):
+            bar.setValue(ndx + 1)
+            bar.setFormat('%v / %m  ({})'.format(value))
+
+    def on_loop_done(self, cancelled):
+        self.start_stop.setText('Start')
+        self.start_stop.setEnabled(True)
+        self.start_stop.setChecked(False)
+
+
+if __name__ == '__main__':
+    import sys
+
+    if '--bench' in sys.argv:
+        # Time to generate the indices and total travel (in steps) of each axis.
+        shape = (200, 200, 25)
+        for snake in (False, True):
+            st = time.perf_counter()
+            count = sum(1 for _ in grid_indices(shape, snake))
+            elapsed = time.perf_counter() - st
+            chunk = _grid_chunk(shape, 0, count, snake)
+            travel = np.abs(np.diff(chunk, axis=1)).sum(axis=1)
+            print('snake={!s:5} {:8.3f} s for {} points, travel per axis {}'.format(
+                snake, elapsed, count, travel.tolist()))
+    else:
+        from types import SimpleNamespace
+
+        def func(counter, index, values, overrun):
+            print('func', counter, index, values, overrun)
+            return sum(values)
+
+        stage = SimpleNamespace(x=0, y=0)
+        app = NDScan(axes=[ScanAxis(stage, 'x', range(3)), ScanAxis(stage, 'y', range(4))])
+        app.body = func
+        start_gui_app(app, NDScanUi)
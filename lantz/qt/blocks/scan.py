@@ -12,10 +12,15 @@
 
 import time
 import math
+import operator
 from enum import IntEnum
 
+import numpy as np
+
 from ..utils.qt import QtCore, QtGui
 from ..app import Frontend, Backend, start_gui_app
+from ..utils.recorder import RecordingMixin
+from ..utils.telemetry import IterationTelemetry, format_summary
 
 
 def _linspace_args(start, stop, step_size=None, length=None):
@@ -77,6 +82,84 @@ def _linspace(start, stop, step_size=None, length=None):
         yield start + i * step_size
 
 
+class LinearSteps(object):
+    """A lazy sequence of linearly spaced steps: start + i * step_size
+    for i in range(length).
+
+    Supports len, indexing and iteration without storing the values.
+
+    Parameters
+    ----------
+    start : float
+        first step.
+    step_size : float
+        difference between consecutive steps.
+    length : int
+        number of steps.
+    """
+
+    def __init__(self, start, step_size, length):
+        self.start = start
+        self.step_size = step_size
+        self.length = max(int(length), 0)
+
+    @classmethod
+    def from_limits(cls, start, stop, step_size=None, length=None):
+        """Linear spacing from start to stop with defined step_size OR length
+        (as _linspace).
+        """
+        step_size, length = _linspace_args(start, stop, step_size, length)
+        return cls(start, step_size, length)
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError('step index out of range')
+        return self.start + index * self.step_size
+
+    def __iter__(self):
+        start, step_size = self.start, self.step_size
+        for i in range(self.length):
+            yield start + i * step_size
+
+    def __repr__(self):
+        return '{}({!r}, {!r}, {!r})'.format(type(self).__name__, self.start, self.step_size, self.length)
+
+
+def steps_from_file(filename, dtype=float):
+    """Memory map a file of predefined steps, to be given to Scan.start.
+
+    Only the pages of the file that are used are read, so sweeps larger
+    than the available memory can be scanned.
+
+    Parameters
+    ----------
+    filename : str
+        a .npy file (saved with numpy.save) or a raw binary file.
+    dtype :
+        NumPy data type of a raw binary file. (Default value = float)
+
+    Returns
+    -------
+    numpy.memmap
+        a read only 1-D array.
+    """
+    if filename.endswith('.npy'):
+        steps = np.load(filename, mmap_mode='r')
+    else:
+        steps = np.memmap(filename, dtype=dtype, mode='r')
+
+    return steps.reshape(-1)
+
+
+#: Marks the end of the steps.
+_END = object()
+
+
 class StepsMode(IntEnum):
     """Step calculation modes."""
 
@@ -87,7 +170,7 @@ class StepsMode(IntEnum):
     step_count = 1
 
 
-class Scan(Backend):
+class Scan(RecordingMixin, Backend):
     """A backend that iterates over an list of values,
     calling a `body` function in each step.
 
@@ -107,6 +190,17 @@ class Scan(Backend):
     #: The parameter is used to inform if the loop was canceled.
     loop_done = QtCore.Signal(bool)
 
+    #: Signal emitted periodically (every `telemetry_update_interval` seconds)
+    #: and when the loop finishes with the summary of the per iteration
+    #: telemetry (see IterationTelemetry.summary).
+    telemetry_updated = QtCore.Signal(object)
+
+    #: Minimum time in seconds between telemetry_updated signals.
+    telemetry_update_interval = .5
+
+    #: Number of iterations kept in the telemetry buffer.
+    telemetry_capacity = 10000
+
     #: The function to be called. It requires three parameters.
     #:    counter - the iteration number.
     #:    current value - the current value of the scan.
@@ -126,6 +220,10 @@ class Scan(Backend):
         self._active = False
         self._internal_func = None
 
+        #: Per iteration timing (IterationTelemetry) of the current or last scan.
+        self.telemetry = IterationTelemetry(self.telemetry_capacity)
+        self._telemetry_emitted = 0.
+
     def stop(self):
         """Request the scanning to be stop.
         Will stop when the current iteration is finished.
@@ -139,7 +237,13 @@ class Scan(Backend):
         """
         self._active = False
 
-    def start(self, body, interval=0, steps=(), timeout=0):
+    def _publish_telemetry(self, force=False):
+        now = time.perf_counter()
+        if force or now - self._telemetry_emitted > self.telemetry_update_interval:
+            self._telemetry_emitted = now
+            self.telemetry_updated.emit(self.telemetry.summary())
+
+    def start(self, body, interval=0, steps=(), timeout=0, length=None):
         """Request the scanning to be started.
 
         Parameters
@@ -152,11 +256,18 @@ class Scan(Backend):
             If the body takes too long, the iteration will
             be as fast as possible and the overrun flag will be True (Default value = 0)
         steps :
-            iterable (Default value = ()
+            iterable of values, consumed lazily (e.g. a list, a NumPy or
+            memory mapped array, LinearSteps or a generator that can
+            adapt the next step to the previous measurements). The scan
+            finishes when the steps are exhausted. (Default value = ()
         timeout :
             total time in seconds that the scanning will take.
             If overdue, the scanning will be stopped.
             If 0, there is no timeout.
+        length :
+            number of steps, used only to report progress.
+            If None, it is obtained from the steps (if possible)
+            or reported as 0 (unknown). (Default value = None)
 
         Returns
         -------
@@ -165,38 +276,71 @@ class Scan(Backend):
         self._active = True
         body = body or self.body
 
-        iterations = len(steps)
+        iterations = operator.length_hint(steps, 0) if length is None else length
+        steps = iter(steps)
 
-        def internal(counter, overrun=False, schedule=QtCore.QTimer.singleShot):
+        telemetry = self.telemetry
+        telemetry.clear()
+        self._telemetry_emitted = 0.
+
+        def timed(func, counter, value, overrun):
+            if func is None:
+                return math.nan
+            st = time.perf_counter()
+            func(counter, value, overrun)
+            return time.perf_counter() - st
+
+        def internal(counter, value, overrun=False, scheduled=None, schedule=QtCore.QTimer.singleShot):
             if not self._active:
                 self.loop_done.emit(True)
                 return
 
-            st = time.time()
+            st = time.perf_counter()
             self.iteration.emit(counter, iterations, overrun)
-            if self._pre_body is not None:
-                self._pre_body(counter, steps[counter], overrun)
-            if body is not None:
-                body(counter, steps[counter], overrun)
-            if self._post_body is not None:
-                self._post_body(counter, steps[counter], overrun)
-
-            if iterations and counter + 1 == iterations:
+            dispatch = time.perf_counter() - st
+
+            pre = timed(self._pre_body, counter, value, overrun)
+            main = timed(body, counter, value, overrun)
+            post = timed(self._post_body, counter, value, overrun)
+
+            now = time.perf_counter()
+            telemetry.add(counter, st, st - scheduled, dispatch, pre, main, post, now - st)
+
+            # Fetched after the body, so generators can adapt to its results.
+            next_value = next(steps, _END)
+
+            if next_value is _END:
                 self._active = False
+                self._publish_telemetry(True)
                 self.loop_done.emit(False)
                 return
             elif not self._active:
+                self._publish_telemetry(True)
                 self.loop_done.emit(True)
                 return
 
-            sleep = interval - (time.time() - st)
-            schedule(sleep * 1000 if sleep > 0 else 0,
-                     lambda: self._internal_func(counter + 1, sleep < 0))
+            self._publish_telemetry()
+
+            now = time.perf_counter()
+            sleep = interval - (now - st)
+            next_scheduled = now + max(sleep, 0)
+            schedule(int(sleep * 1000) if sleep > 0 else 0,
+                     lambda: self._internal_func(counter + 1, next_value, sleep < 0, next_scheduled))
+
+        def empty():
+            self._active = False
+            self.loop_done.emit(False)
 
         self._internal_func = internal
+        first = next(steps, _END)
+        if first is _END:
+            QtCore.QTimer.singleShot(0, empty)
+            return
+
         if timeout:
-            QtCore.QTimer.singleShot(timeout * 1000, self.stop)
-        QtCore.QTimer.singleShot(0, lambda: self._internal_func(0))
+            QtCore.QTimer.singleShot(int(timeout * 1000), self.stop)
+        scheduled = time.perf_counter()
+        QtCore.QTimer.singleShot(0, lambda: self._internal_func(0, first, scheduled=scheduled))
 
 
 class ScanUi(Frontend):
@@ -244,6 +388,7 @@ class ScanUi(Frontend):
 
         self.backend.iteration.connect(self.on_iteration)
         self.backend.loop_done.connect(self.on_loop_done)
+        self.backend.telemetry_updated.connect(self.on_telemetry_updated)
 
         self.request_start.connect(self.backend.start)
         self.request_stop.connect(self.backend.stop)
@@ -262,7 +407,7 @@ class ScanUi(Frontend):
                 for name in 'start stop step_size step_count wait'.split()]
         start, stop, step_size, step_count, interval = vals
 
-        steps = list(_linspace(start, stop, step_size))
+        steps = LinearSteps.from_limits(start, stop, step_size)
 
         self.request_start.emit(None, interval, steps)
 
@@ -296,6 +441,9 @@ class ScanUi(Frontend):
         else:
             pbar.setPalette(self._ok_palette)
 
+    def on_telemetry_updated(self, summary):
+        self.widget.telemetry.setText(format_summary(summary))
+
     def on_mode_changed(self, new_index):
         if new_index == StepsMode.step_size:
             self.widget.step_count.setEnabled(False)
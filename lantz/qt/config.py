@@ -23,3 +23,8 @@ PRINT_TRACEBACK = register_and_get('qt.print_traceback', 'false') == 'true'
 # Qt API wrapper to use in lantz.
 # valid values: mock, pyqt, pyqt5, pyqtv1, pyqtdefault, pyside, pyside2
 QT_API = register_and_get('qt.api', os.environ.get('QT_API', ''))
+
+# Directory where compiled Qt Designer (.ui) files are stored
+# to speed up the start of applications. Empty to disable.
+UI_CACHE_DIR = register_and_get('qt.ui_cache_dir',
+                                os.path.join(os.path.expanduser('~'), '.cache', 'lantz', 'ui'))
@@ -20,6 +20,7 @@ from lantz.core.helpers import MISSING
 from .log import LOGGER
 from .utils.qt import QtCore, QtGui
 from .widgets import WidgetMixin, ChildrenWidgets
+from .widgets.initialize import InitTimeline, InitGanttWidget
 
 
 def connect_feat(widget, target, feat_name=None, feat_key=MISSING):
@@ -70,8 +71,8 @@ def connect_feat(widget, target, feat_name=None, feat_key=MISSING):
     widget.bind_feat(feat)
     widget.feat_key = feat_key
 
+    # Setting the target requests the current value (without blocking).
     widget.lantz_target = target
-    widget.setValue(widget.value_from_feat())
 
 
 def connect_driver(parent, target, *, prefix='', sep='__'):
@@ -95,16 +96,9 @@ def connect_driver(parent, target, *, prefix='', sep='__'):
 
     ChildrenWidgets.patch(parent)
 
-    if prefix:
-        prefix += sep
-
-    for name, _, wid in parent.widgets:
-        if prefix and name.startswith(prefix):
-            name = name[len(prefix):]
-        if sep in name:
-            name, _ = name.split(sep, 1)
-        if name in target.feats:
-            connect_feat(wid, target, name)
+    widgets = [(name, wid) for name, _, wid in parent.widgets]
+    for wid, target, name in _match_widgets(widgets, [(prefix, target)], sep):
+        connect_feat(wid, target, name)
 
 
 def connect_setup(parent, targets, *, prefix=None, sep='__'):
@@ -129,11 +123,83 @@ def connect_setup(parent, targets, *, prefix=None, sep='__'):
     LOGGER.debug('Connecting {} to {}, {}, {}'.format(parent, targets, prefix, sep))
 
     ChildrenWidgets.patch(parent)
+
+    prefixed = []
     for target in targets:
         name = target.name
         if isinstance(prefix, dict):
             name = prefix[name]
-        connect_driver(parent, target, prefix=name, sep=sep)
+        prefixed.append((name, target))
+
+    # The widget tree is walked once for all drivers.
+    widgets = [(name, wid) for name, _, wid in parent.widgets]
+    for wid, target, name in _match_widgets(widgets, prefixed, sep):
+        connect_feat(wid, target, name)
+
+
+def _match_widgets(widgets, prefixed, sep):
+    """Match widgets to driver feats by name.
+
+    A widget named `<prefix><sep><feat name>[<sep><anything>]` matches the
+    feat of the driver with that prefix. A widget whose name does not start
+    with the prefix of a driver matches it as `<feat name>[<sep><anything>]`.
+    If a widget matches many drivers, the last one is used (as connecting
+    them one after the other would do).
+
+    Parameters
+    ----------
+    widgets : list of (str, QWidget)
+        widget names and widgets.
+    prefixed : list of (str, Driver)
+        prefix (can be empty) and driver.
+    sep : str
+        separator.
+
+    Returns
+    -------
+    list of (QWidget, Driver, str)
+        widget, driver and feat name.
+    """
+
+    #: Dict[prefix + sep, list of driver positions]
+    by_prefix = {}
+
+    #: Dict[feat name, list of driver positions]
+    by_feat = {}
+
+    for ndx, (prefix, target) in enumerate(prefixed):
+        if prefix:
+            by_prefix.setdefault(prefix + sep, []).append(ndx)
+        for feat_name in target.feats.keys():
+            by_feat.setdefault(feat_name, []).append(ndx)
+
+    out = []
+    for name, wid in widgets:
+        best, best_name = -1, None
+
+        # Drivers whose prefix matches. The prefix plus separator
+        # must end at an occurrence of the separator in the name.
+        matched = set()
+        pos = name.find(sep)
+        while pos >= 0 and by_prefix:
+            end = pos + len(sep)
+            for ndx in by_prefix.get(name[:end], ()):
+                matched.add(ndx)
+                feat_name = name[end:].split(sep, 1)[0]
+                if ndx > best and feat_name in prefixed[ndx][1].feats:
+                    best, best_name = ndx, feat_name
+            pos = name.find(sep, pos + 1)
+
+        # Drivers without a matching prefix use the full name.
+        feat_name = name.split(sep, 1)[0]
+        for ndx in by_feat.get(feat_name, ()):
+            if ndx > best and ndx not in matched:
+                best, best_name = ndx, feat_name
+
+        if best >= 0:
+            out.append((wid, prefixed[best][1], best_name))
+
+    return out
 
 
 def connect_initialize_flock(widget, flock, register_finalizer=True,
@@ -196,9 +262,12 @@ def connect_initialize(widget, drivers, register_finalizer=True,
     Returns
     -------
     type
-        the QThread doing the initialization.
+        the QThread doing the initialization and the InitializerHelper.
+        The start and end time of each driver are recorded in
+        `helper.timeline` (an InitTimeline), which can be exported.
 
     """
+    drivers = list(drivers)
     timing = {}
 
     thread = QtCore.QThread()
@@ -207,20 +276,20 @@ def connect_initialize(widget, drivers, register_finalizer=True,
     thread.helper = helper
 
     if isinstance(widget, QtGui.QTableWidget):
+        rows = {id(driver): ndx for ndx, driver in enumerate(drivers)}
+
         def _initializing(driver):
             timing[driver] = time.perf_counter()
-            row = drivers.index(driver)
-            widget.setItem(row, 2, QtGui.QTableWidgetItem(initializing_msg))
+            widget.setItem(rows[id(driver)], 2, QtGui.QTableWidgetItem(initializing_msg))
 
         def _initialized(driver):
             delta = time.perf_counter() - timing[driver]
-            row = drivers.index(driver)
-            widget.setItem(row, 2, QtGui.QTableWidgetItem(initialized_msg + ' ({:.1f} sec)'.format(delta)))
+            widget.setItem(rows[id(driver)], 2,
+                           QtGui.QTableWidgetItem(initialized_msg + ' ({:.1f} sec)'.format(delta)))
 
         def _exception(driver, e):
             delta = time.perf_counter() - timing[driver]
-            row = drivers.index(driver)
-            widget.setItem(row, 2, QtGui.QTableWidgetItem('{} ({:.1f} sec)'.format(e, delta)))
+            widget.setItem(rows[id(driver)], 2, QtGui.QTableWidgetItem('{} ({:.1f} sec)'.format(e, delta)))
 
         def _done(duration):
             widget.setItem(len(drivers), 2, QtGui.QTableWidgetItem('{:.1f} sec'.format(duration)))
@@ -281,6 +350,19 @@ def connect_initialize(widget, drivers, register_finalizer=True,
 
         widget.setReadOnly(True)
 
+    elif isinstance(widget, InitGanttWidget):
+
+        def _initializing(driver):
+            pass
+
+        _initialized = _exception = _initializing
+
+        def _done(duration):
+            widget.on_finished()
+            thread.quit()
+
+        widget.set_timeline(helper.timeline)
+
     else:
         raise TypeError('Unknown widget type {}.'.format(type(widget)))
 
@@ -308,7 +390,12 @@ class InitializerHelper(QtCore.QObject):
         self.parallel = parallel
         self.dependencies = dependencies
 
+        #: Timing of the last initialization.
+        #: Recorded in the initializing threads, before signals are queued.
+        self.timeline = InitTimeline()
+
     def process(self):
+        timeline = self.timeline
         start = time.perf_counter()
         initialize_many(drivers=self.drivers, register_finalizer=self.register_finalizer,
                         on_initializing=self.on_initializing,
@@ -316,13 +403,74 @@ class InitializerHelper(QtCore.QObject):
                         on_exception=self.on_exception,
                         concurrent=self.parallel,
                         dependencies=self.dependencies)
+        timeline.finish()
         self.finished.emit(time.perf_counter() - start)
 
     def on_initializing(self, driver):
+        self.timeline.started(driver)
         self.initializing.emit(driver)
 
     def on_initialized(self, driver):
+        self.timeline.stopped(driver)
         self.initialized.emit(driver)
 
     def on_exception(self, driver, ex):
+        self.timeline.stopped(driver, ex)
         self.exception.emit(driver, ex)
+
+
+if __name__ == '__main__':
+    # Benchmark matching widgets to driver feats in large synthetic
+    # widget trees, comparing one pass over the tree per driver
+    # (the previous implementation) with a single indexed pass.
+
+    import timeit
+    import collections
+
+    app = QtGui.QApplication([])
+
+    FakeDriver = collections.namedtuple('FakeDriver', 'name feats')
+
+    def build_tree(drivers, feats_per_driver, depth=4):
+        root = QtGui.QWidget()
+        containers = [root]
+        for level in range(depth):
+            container = QtGui.QWidget(containers[-1])
+            container.setObjectName('container{}'.format(level))
+            containers.append(container)
+
+        count = 0
+        for driver in drivers:
+            for feat_name in driver.feats:
+                wid = QtGui.QWidget(containers[count % len(containers)])
+                wid.setObjectName('{}__{}__{}'.format(driver.name, feat_name, count))
+                count += 1
+        return root
+
+    def per_driver(parent, targets, sep='__'):
+        out = []
+        for target in targets:
+            prefix = target.name + sep
+            for name, _, wid in ChildrenWidgets(parent):
+                if name.startswith(prefix):
+                    name = name[len(prefix):]
+                if sep in name:
+                    name, _ = name.split(sep, 1)
+                if name in target.feats:
+                    out.append((wid, target, name))
+        return out
+
+    def indexed(parent, targets, sep='__'):
+        widgets = [(name, wid) for name, _, wid in ChildrenWidgets(parent)]
+        return _match_widgets(widgets, [(target.name, target) for target in targets], sep)
+
+    for ndrivers, nfeats in ((5, 40), (30, 70), (60, 70)):
+        drivers = [FakeDriver('driver{}'.format(n), {'feat{}'.format(m): None for m in range(nfeats)})
+                   for n in range(ndrivers)]
+        root = build_tree(drivers, nfeats)
+        assert len(per_driver(root, drivers)) == len(indexed(root, drivers)) == ndrivers * nfeats
+
+        for label, func in (('per driver', per_driver), ('indexed', indexed)):
+            elapsed = min(timeit.repeat(lambda: func(root, drivers), number=1, repeat=3))
+            print('{:3d} drivers {:5d} widgets {:12s} {:8.1f} ms'.format(ndrivers, ndrivers * nfeats,
+                                                                         label, elapsed * 1000))
@@ -9,6 +9,12 @@
     :license: BSD, see LICENSE for more details.
 """
 
+import weakref
+import operator
+import threading
+
+from lantz.core.helpers import MISSING
+
 from .utils.qt import QtCore, SuperQObject
 
 
@@ -16,7 +22,69 @@ class QDriver(QtCore.QObject):
     pass
 
 
+#: Generated classes by wrapped class and signature.
+#: The wrapped class is weakly referenced and the generated classes are
+#: kept as long as it is alive, so wrapping the same class again always
+#: returns the identical type. (Classes generated by wrap_driver_cls derive
+#: from the wrapped class, so in practice they live as long as the process,
+#: like the driver classes themselves.)
+#: WeakKeyDictionary[type, Dict[tuple, type]]
+_CLASS_CACHE = weakref.WeakKeyDictionary()
+_CLASS_CACHE_LOCK = threading.Lock()
+
+
+def _cached_class(wrapped_cls, signature, factory):
+    """Return the class generated for wrapped_cls and signature,
+    calling factory() to build it only if it is not in the cache.
+    """
+    with _CLASS_CACHE_LOCK:
+        by_signature = _CLASS_CACHE.get(wrapped_cls)
+        if by_signature is None:
+            by_signature = _CLASS_CACHE[wrapped_cls] = {}
+
+        cls = by_signature.get(signature)
+        if cls is None:
+            cls = by_signature[signature] = factory()
+
+        return cls
+
+
 def wrap_driver(wrapped_obj, parent_qobj=None):
+    """Wrap a driver instance into a QObject with a Qt signal
+    for each Feat and DictFeat (named `<feat name>_changed`).
+
+    The generated class is cached and reused for other instances of
+    the same class with the same feats.
+    """
+
+    signature = (tuple(wrapped_obj.feats.keys()),
+                 tuple(wrapped_obj.dictfeats.keys()),
+                 tuple(wrapped_obj.actions.keys()))
+    cls = _cached_class(type(wrapped_obj), signature, lambda: _build_qobj_cls(*signature))
+
+    return cls(wrapped_obj, parent_qobj)
+
+
+#: Attributes of the wrapped object (besides feats, dictfeats and actions)
+#: that are frequently accessed by widgets and therefore forwarded directly.
+_FORWARDED = ('name', 'feats', 'dictfeats', 'actions')
+
+
+def _forward(name):
+    """Build a property forwarding get and set of an attribute
+    to the wrapped object.
+
+    The getter is an operator.attrgetter, which avoids creating
+    a Python frame on each read.
+    """
+
+    def fset(self, value):
+        setattr(self.wrapped_obj, name, value)
+
+    return property(operator.attrgetter('wrapped_obj.' + name), fset)
+
+
+def _build_qobj_cls(feat_names, dictfeat_names, action_names):
 
     SUFFIX = '_changed'
     PYSUFFIX = '_py_changed'
@@ -27,39 +95,168 @@ def wrap_driver(wrapped_obj, parent_qobj=None):
             super().__init__(parent)
             self.wrapped_obj = obj
 
-        # Qt Signals need to be added to the class before it is created.
-        # We loop through all members of the class and add a changed event
-        # for each Feat/DictFeat.
+        # Feats, DictFeats, actions and commonly used attributes are forwarded
+        # to the wrapped object with properties built with the class.
+        # __getattr__ is only used for other attributes.
 
-        # We do the same thing for all base classes which are not derived from
-        # Driver (checking for the attribute _lantz_feats) to enable base clases
-        # for drivers that do not derive from Driver.
+        for attr_name in _FORWARDED + tuple(feat_names) + tuple(dictfeat_names) + tuple(action_names):
+            locals()[attr_name] = _forward(attr_name)
 
         def __getattr__(self, item):
-            if item in self.__dict__:
-                return getattr(self, item)
+            if item == 'wrapped_obj':
+                raise AttributeError(item)
 
             return getattr(self.wrapped_obj, item)
 
-        for feat_name in wrapped_obj.feats.keys():
+        # Qt Signals need to be added to the class before it is created.
+        # We loop through all members of the class and add a changed event
+        # for each Feat/DictFeat.
+
+        for feat_name in feat_names:
             #locals()[feat_name + PYSUFFIX] = getattr(wrapped_obj, feat_name + SUFFIX)
             locals()[feat_name + SUFFIX] = QtCore.pyqtSignal(object, object)
 
-        for feat_name in wrapped_obj.dictfeats.keys():
+        for feat_name in dictfeat_names:
             #locals()[feat_name + PYSUFFIX] = getattr(wrapped_obj, feat_name + SUFFIX)
             locals()[feat_name + SUFFIX] = QtCore.pyqtSignal(object, object, object)
 
-    obj = QObj(wrapped_obj, parent_qobj)
+    return QObj
+
+
+class _CoalescedSignal(object):
+    """Descriptor replacing a `_changed` signal in a wrapped class
+    that coalesces emissions.
+
+    Emitting stores the latest value per feat (and key) and the actual
+    Qt signal (stored as `_qt_<name>`) is emitted when the pending
+    changes are flushed. Connecting and disconnecting is delegated to the
+    actual Qt signal.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        bound = _BoundCoalescedSignal(instance, self.name, getattr(instance, '_qt_' + self.name))
+        # Cache the bound object in the instance to make the next access
+        # a plain dictionary lookup.
+        instance.__dict__[self.name] = bound
+        return bound
+
+
+class _BoundCoalescedSignal(object):
+
+    def __init__(self, instance, name, signal):
+        self._instance = instance
+        self._name = name
+        self._signal = signal
+
+    def emit(self, value, old_value, key=MISSING):
+        self._instance._coalesce_change(self._name, key, value, old_value)
+
+    def connect(self, *args, **kwargs):
+        return self._signal.connect(*args, **kwargs)
 
-    return obj
+    def disconnect(self, *args):
+        return self._signal.disconnect(*args)
 
+    def __getattr__(self, item):
+        return getattr(self._signal, item)
 
-def wrap_driver_cls(wrapped_cls):
+
+class _CoalescingMixin(object):
+    """Keeps only the latest value of each changed feat (and key for
+    DictFeats) and emits the corresponding `_changed` signals at a fixed rate.
+    """
+
+    #: Seconds between flushes of pending changes.
+    _coalesce_interval = None
+
+    def _init_coalescing(self):
+        self._coalesce_lock = threading.Lock()
+
+        #: Dict[(str, key), (value, old value)]
+        self._coalesce_pending = {}
+
+        #: Number of intermediate values that were never emitted.
+        self.coalesced_dropped = 0
+
+        # The timer is a child of this object and therefore
+        # moves with it to other threads.
+        self._coalesce_timer = QtCore.QTimer(self)
+        self._coalesce_timer.setInterval(int(self._coalesce_interval * 1000))
+        self._coalesce_timer.timeout.connect(self.flush_changes)
+        self._coalesce_timer.start()
+
+    def _coalesce_change(self, name, key, value, old_value):
+        with self._coalesce_lock:
+            previous = self._coalesce_pending.get((name, key))
+            if previous is not None:
+                # Keep the old value of the first change
+                # so that observers see the complete transition.
+                old_value = previous[1]
+                self.coalesced_dropped += 1
+            self._coalesce_pending[(name, key)] = (value, old_value)
+
+    def flush_changes(self):
+        """Emit the `_changed` signals of all pending changes.
+        """
+        with self._coalesce_lock:
+            if not self._coalesce_pending:
+                return
+            pending, self._coalesce_pending = self._coalesce_pending, {}
+
+        for (name, key), (value, old_value) in pending.items():
+            signal = getattr(self, '_qt_' + name)
+            if key is MISSING:
+                signal.emit(value, old_value)
+            else:
+                signal.emit(value, old_value, key)
+
+
+def wrap_driver_cls(wrapped_cls, coalesce_interval=None):
+    """Wrap a Driver class into a QObject with a Qt signal
+    for each Feat and DictFeat (named `<feat name>_changed`).
+
+    Parameters
+    ----------
+    wrapped_cls : type
+        Driver class.
+    coalesce_interval : float or None
+        If given, changes are not emitted immediately. Instead, only the
+        latest value of each feat (and key for DictFeats) is kept and the
+        signals are emitted every `coalesce_interval` seconds. Intermediate
+        values are dropped and counted in `coalesced_dropped`.
+        Useful for drivers polled faster than the GUI can redraw. (Default value = None)
+
+    Returns
+    -------
+    type
+        the generated class. Wrapping the same class (with the same feats and
+        arguments) again returns the identical class.
+    """
+
+    signature = (tuple(wrapped_cls._lantz_feats.keys()),
+                 tuple(wrapped_cls._lantz_dictfeats.keys()),
+                 coalesce_interval)
+
+    return _cached_class(wrapped_cls, signature,
+                         lambda: _build_wrapped_cls(wrapped_cls, coalesce_interval))
+
+
+def _build_wrapped_cls(wrapped_cls, coalesce_interval):
 
     SUFFIX = '_changed'
     PYSUFFIX = '_py_changed'
 
-    class WrappedCLS(wrapped_cls, SuperQObject):
+    if coalesce_interval:
+        bases = (wrapped_cls, _CoalescingMixin, SuperQObject)
+    else:
+        bases = (wrapped_cls, SuperQObject)
+
+    class WrappedCLS(*bases):
 
         # Qt Signals need to be added to the class before it is created.
         # We loop through all members of the class and add a changed event
@@ -67,12 +264,64 @@ def wrap_driver_cls(wrapped_cls):
 
         for feat_name in wrapped_cls._lantz_feats.keys():
             #locals()[feat_name + PYSUFFIX] = getattr(wrapped_obj, feat_name + SUFFIX)
-            locals()[feat_name + SUFFIX] = QtCore.pyqtSignal(object, object)
+            if coalesce_interval:
+                locals()['_qt_' + feat_name + SUFFIX] = QtCore.pyqtSignal(object, object)
+                locals()[feat_name + SUFFIX] = _CoalescedSignal(feat_name + SUFFIX)
+            else:
+                locals()[feat_name + SUFFIX] = QtCore.pyqtSignal(object, object)
 
         for feat_name in wrapped_cls._lantz_dictfeats.keys():
             #locals()[feat_name + PYSUFFIX] = getattr(wrapped_obj, feat_name + SUFFIX)
-            locals()[feat_name + SUFFIX] = QtCore.pyqtSignal(object, object, object)
+            if coalesce_interval:
+                locals()['_qt_' + feat_name + SUFFIX] = QtCore.pyqtSignal(object, object, object)
+                locals()[feat_name + SUFFIX] = _CoalescedSignal(feat_name + SUFFIX)
+            else:
+                locals()[feat_name + SUFFIX] = QtCore.pyqtSignal(object, object, object)
+
+        if coalesce_interval:
+            _coalesce_interval = coalesce_interval
+
+            def __init__(self, *args, **kwargs):
+                # The QObject is already initialized in SuperQObject.__new__,
+                # coalescing must be ready before the driver emits anything.
+                self._init_coalescing()
+                super().__init__(*args, **kwargs)
 
     WrappedCLS.__name__ = 'Qt' + wrapped_cls.__name__
 
     return WrappedCLS
+
+
+if __name__ == '__main__':
+    # Microbenchmark comparing attribute forwarding in wrap_driver proxies
+    # with the previous implementation based only on __getattr__.
+
+    import timeit
+
+    from lantz.core import Driver, Feat
+
+    class BenchDriver(Driver):
+
+        @Feat()
+        def value(self):
+            return 42
+
+    class GetAttrProxy(QDriver):
+
+        def __init__(self, obj, parent=None):
+            super().__init__(parent)
+            self.wrapped_obj = obj
+
+        def __getattr__(self, item):
+            if item in self.__dict__:
+                return getattr(self, item)
+
+            return getattr(self.wrapped_obj, item)
+
+    driver = BenchDriver()
+    number = 100000
+    for label, proxy in (('__getattr__', GetAttrProxy(driver)),
+                         ('descriptors', wrap_driver(driver))):
+        for attr in ('name', 'value'):
+            elapsed = timeit.timeit(lambda: getattr(proxy, attr), number=number)
+            print('{:12s} {:6s} {:8.3f} us/read'.format(label, attr, elapsed / number * 1e6))
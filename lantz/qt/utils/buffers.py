@@ -0,0 +1,416 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.qt.utils.buffers
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Preallocated, NumPy backed buffers to store streaming data.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import numpy as np
+
+
+class RingBuffer(object):
+    """A columnar buffer of rows backed by a preallocated NumPy array.
+
+    Data is stored column-major so that each column is a contiguous
+    array and can be handed to plotting libraries without copying.
+
+    If capacity is given, the buffer keeps only the last `capacity` rows.
+    Internally the storage is twice the capacity and each row is written
+    twice (at i and i + capacity). This guarantees that the last
+    `capacity` rows are always a contiguous slice.
+
+    If capacity is None, the buffer grows (in chunks) without bound.
+
+    Parameters
+    ----------
+    columns : int
+        number of columns of each row. (Default value = 1)
+    capacity : int or None
+        maximum number of rows to keep. (Default value = None)
+    chunk_size : int
+        minimum number of rows allocated when an unbounded buffer grows.
+        (Default value = 4096)
+    dtype :
+        NumPy data type. (Default value = float)
+    """
+
+    def __init__(self, columns=1, capacity=None, chunk_size=4096, dtype=float):
+        if capacity is not None and capacity < 1:
+            raise ValueError('capacity must be a positive integer or None, not {}'.format(capacity))
+
+        self._columns = columns
+        self._capacity = capacity
+        self._chunk_size = chunk_size
+
+        if capacity is None:
+            self._data = np.empty((columns, chunk_size), dtype=dtype)
+        else:
+            self._data = np.empty((columns, 2 * capacity), dtype=dtype)
+
+        #: Position where the next row will be written.
+        self._head = 0
+
+        #: Number of valid rows.
+        self._size = 0
+
+        #: Number of rows appended since creation (or last clear).
+        self._total = 0
+
+    @property
+    def columns(self):
+        """Number of columns."""
+        return self._columns
+
+    @property
+    def capacity(self):
+        """Maximum number of rows or None if unbounded."""
+        return self._capacity
+
+    @property
+    def total(self):
+        """Number of rows appended since creation or the last clear,
+        including those that were discarded.
+        """
+        return self._total
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    def __len__(self):
+        return self._size
+
+    def clear(self):
+        """Remove all rows (storage is kept)."""
+        self._head = 0
+        self._size = 0
+        self._total = 0
+
+    def _grow(self, required):
+        """Reallocate an unbounded buffer to hold at least required rows.
+        """
+        current = self._data.shape[1]
+        new_length = max(required, current + max(self._chunk_size, current // 2))
+        new_length = -(-new_length // self._chunk_size) * self._chunk_size
+        data = np.empty((self._columns, new_length), dtype=self._data.dtype)
+        data[:, :self._size] = self._data[:, :self._size]
+        self._data = data
+
+    def append(self, row):
+        """Append a single row.
+
+        Parameters
+        ----------
+        row : scalar or sequence
+            a sequence of length `columns` or a scalar if columns is 1.
+        """
+        data = self._data
+        capacity = self._capacity
+
+        if capacity is None:
+            if self._size == data.shape[1]:
+                self._grow(self._size + 1)
+                data = self._data
+            data[:, self._size] = row
+            self._size += 1
+        else:
+            head = self._head
+            data[:, head] = row
+            data[:, head + capacity] = row
+            self._head = (head + 1) % capacity
+            if self._size < capacity:
+                self._size += 1
+
+        self._total += 1
+
+    def extend(self, rows):
+        """Append multiple rows at once.
+
+        Parameters
+        ----------
+        rows : array like
+            an array of shape (columns, n). A 1-D array is also accepted if
+            the buffer has a single column.
+        """
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        if rows.ndim == 1:
+            rows = rows.reshape(1, -1)
+
+        if rows.shape[0] != self._columns:
+            raise ValueError('Expected {} columns, got {}'.format(self._columns, rows.shape[0]))
+
+        count = rows.shape[1]
+        if not count:
+            return
+
+        data = self._data
+        capacity = self._capacity
+
+        if capacity is None:
+            if self._size + count > data.shape[1]:
+                self._grow(self._size + count)
+                data = self._data
+            data[:, self._size:self._size + count] = rows
+            self._size += count
+
+        elif count >= capacity:
+            rows = rows[:, -capacity:]
+            data[:, :capacity] = rows
+            data[:, capacity:] = rows
+            self._head = 0
+            self._size = capacity
+
+        else:
+            head = self._head
+            first = min(count, capacity - head)
+            data[:, head:head + first] = rows[:, :first]
+            data[:, head + capacity:head + capacity + first] = rows[:, :first]
+            rest = count - first
+            if rest:
+                data[:, :rest] = rows[:, first:]
+                data[:, capacity:capacity + rest] = rows[:, first:]
+            self._head = (head + count) % capacity
+            self._size = min(self._size + count, capacity)
+
+        self._total += count
+
+    def _start(self):
+        if self._capacity is None:
+            return 0
+        return (self._head - self._size) % self._capacity
+
+    def view(self):
+        """Return a view (not a copy) of the valid rows,
+        from oldest to newest, as an array of shape (columns, len(self)).
+
+        The view is only valid until the next append, extend or clear.
+        """
+        start = self._start()
+        return self._data[:, start:start + self._size]
+
+    def column(self, index):
+        """Return a contiguous view (not a copy) of a single column,
+        from oldest to newest.
+
+        The view is only valid until the next append, extend or clear.
+        """
+        start = self._start()
+        return self._data[index, start:start + self._size]
+
+    def last(self):
+        """Return a copy of the newest row, or None if empty."""
+        if not self._size:
+            return None
+        if self._capacity is None:
+            return self._data[:, self._size - 1].copy()
+        return self._data[:, (self._head - 1) % self._capacity].copy()
+
+
+class _PyramidLevel(object):
+    """A level of a MinMaxPyramid.
+
+    Each item of this level summarizes `factor` items of the level below.
+    Items not yet grouped are kept in `pending`.
+    """
+
+    def __init__(self, columns, capacity, factor):
+        self.factor = factor
+        self.items = RingBuffer(columns, capacity, chunk_size=1024)
+        self.pending = np.empty((columns, 0))
+
+    def feed(self, items):
+        """Feed items from the level below and return the newly
+        completed items of this level.
+        """
+        if self.pending.shape[1]:
+            items = np.concatenate((self.pending, items), axis=1)
+
+        factor = self.factor
+        complete = items.shape[1] // factor * factor
+
+        self.pending = items[:, complete:].copy()
+        if not complete:
+            return None
+
+        reduced = _reduce(items[:, :complete], factor)
+        self.items.extend(reduced)
+        return reduced
+
+    def clear(self):
+        self.items.clear()
+        self.pending = self.pending[:, :0]
+
+
+def _reduce(items, factor):
+    """Summarize consecutive groups of `factor` items.
+
+    Items are arrays of shape (2 + 4 * curves, n) with rows:
+    x_first, x_last and, for each curve, x_at_min, min, x_at_max, max.
+    """
+    columns, count = items.shape
+    groups = items.reshape(columns, count // factor, factor)
+    out = np.empty((columns, count // factor))
+
+    out[0] = groups[0, :, 0]
+    out[1] = groups[1, :, -1]
+
+    with np.errstate(invalid='ignore'):
+        for offset, fill, argfunc in ((2, np.inf, np.argmin), (4, -np.inf, np.argmax)):
+            xs = groups[offset::4]
+            ys = groups[offset + 1::4]
+            nans = np.isnan(ys)
+            ndx = argfunc(np.where(nans, fill, ys), axis=2)[..., np.newaxis]
+            out[offset::4] = np.take_along_axis(xs, ndx, axis=2)[..., 0]
+            out[offset + 1::4] = np.take_along_axis(ys, ndx, axis=2)[..., 0]
+
+    return out
+
+
+class MinMaxPyramid(object):
+    """A multi-resolution min/max summary of (x, y1, y2, ...) rows
+    which is updated incrementally as rows arrive.
+
+    Level 0 is the raw data (not stored here). Each item of level L
+    summarizes factor ** L consecutive rows by their first and last x
+    and, for each curve, the min and max value (and their x positions).
+    Drawing the min and max of each item preserves peaks that would be
+    lost with plain subsampling.
+
+    Parameters
+    ----------
+    curves : int
+        number of y columns. (Default value = 1)
+    capacity : int or None
+        maximum number of raw rows that are summarized. Older items are
+        discarded. If None, no item is discarded. (Default value = None)
+    factor : int
+        number of items of a level that are summarized in one item of the
+        next level. (Default value = 4)
+    """
+
+    def __init__(self, curves=1, capacity=None, factor=4):
+        self.curves = curves
+        self.capacity = capacity
+        self.factor = factor
+
+        #: PyramidLevels, from finer (factor rows) to coarser.
+        self._levels = []
+
+        #: True if the x values were never decreasing.
+        self.monotonic = True
+
+        #: Last x value appended.
+        self._last_x = -np.inf
+
+    @property
+    def levels(self):
+        """Number of levels (excluding the raw data)."""
+        return len(self._levels)
+
+    def clear(self):
+        self._levels = []
+        self.monotonic = True
+        self._last_x = -np.inf
+
+    def _new_level(self):
+        level = len(self._levels) + 1
+        if self.capacity is None:
+            capacity = None
+        else:
+            capacity = -(-self.capacity // self.factor ** level) + 1
+        self._levels.append(_PyramidLevel(2 + 4 * self.curves, capacity, self.factor))
+
+    def extend(self, rows):
+        """Add raw rows.
+
+        Parameters
+        ----------
+        rows : array like
+            an array of shape (1 + curves, n). The first row is x.
+        """
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim == 1:
+            rows = rows.reshape(-1, 1)
+
+        count = rows.shape[1]
+        if not count:
+            return
+
+        x = rows[0]
+        if self.monotonic:
+            self.monotonic = bool(x[0] >= self._last_x and np.all(np.diff(x) >= 0))
+        self._last_x = x[-1]
+
+        items = np.empty((2 + 4 * self.curves, count))
+        items[0] = items[1] = x
+        items[2::4] = items[4::4] = x
+        items[3::4] = items[5::4] = rows[1:]
+
+        if not self._levels:
+            self._new_level()
+
+        for level in self._levels:
+            items = level.feed(items)
+            if items is None:
+                break
+
+        # Add coarser levels while the top one has enough items.
+        top = self._levels[-1]
+        while len(top.items) >= 2 * self.factor:
+            self._new_level()
+            self._levels[-1].feed(top.items.view())
+            top = self._levels[-1]
+
+    def level_for(self, count, max_items):
+        """Return the finest level for which `count` raw rows
+        are summarized in at most `max_items` items.
+        """
+        level = 0
+        while count > max_items and level < len(self._levels):
+            count = -(-count // self.factor)
+            level += 1
+        return level
+
+    def points(self, level, curve=0, x_range=None):
+        """Return x and y arrays to draw a curve at a given level.
+
+        Each item is drawn as two points (min and max), ordered by x.
+
+        Parameters
+        ----------
+        level : int
+            level to use (must be between 1 and levels).
+        curve : int
+            index of the curve. (Default value = 0)
+        x_range : (float, float) or None
+            if given and the x values are monotonic, only the items in
+            this range are returned. (Default value = None)
+        """
+        items = self._levels[level - 1].items.view()
+
+        if x_range is not None and self.monotonic and items.shape[1]:
+            start = np.searchsorted(items[1], x_range[0], 'left')
+            stop = np.searchsorted(items[0], x_range[1], 'right')
+            items = items[:, start:stop]
+
+        # Items not yet summarized at this level are taken from finer levels.
+        parts = [items]
+        parts.extend(self._levels[ndx].pending for ndx in range(level - 1, -1, -1))
+        items = np.concatenate(parts, axis=1)
+
+        offset = 2 + 4 * curve
+        xa, ya, xb, yb = items[offset:offset + 4]
+        swap = xb < xa
+
+        x = np.empty(2 * len(xa))
+        y = np.empty(2 * len(xa))
+        x[0::2] = np.where(swap, xb, xa)
+        y[0::2] = np.where(swap, yb, ya)
+        x[1::2] = np.where(swap, xa, xb)
+        y[1::2] = np.where(swap, ya, yb)
+
+        return x, y
@@ -17,10 +17,14 @@
     :license: BSD, see the IPython Project for more details.
 """
 
-from .qt_loaders import (load_qt, QT_API_PYQT5, QT_API_PYSIDE2, QT_API_MOCK)
-from .uic import build_loadUi
+from .startup import phase
 
-from ..config import QT_API
+with phase('import qt_loaders and uic'):
+    from .qt_loaders import (load_qt, QT_API_PYQT5, QT_API_PYSIDE2, QT_API_MOCK)
+    from .uic import build_loadUi
+
+with phase('read configuration'):
+    from ..config import QT_API
 
 if QT_API:
 
@@ -34,11 +38,14 @@ if QT_API:
 else:
     api_opts = [QT_API_PYQT5, ]
 
-QtCore, QtGui, QtSvg, QT_API = load_qt(api_opts)
+with phase('load Qt binding'):
+    QtCore, QtGui, QtSvg, QT_API = load_qt(api_opts)
 
-QtGui.loadUi, QtGui.loadUiType = build_loadUi(QT_API)
+with phase('build loadUi'):
+    QtGui.loadUi, QtGui.loadUiType = build_loadUi(QT_API)
 
-QtGui.QToolTip.setFont(QtGui.QFont('SansSerif', 10))
+with phase('set tooltip font'):
+    QtGui.QToolTip.setFont(QtGui.QFont('SansSerif', 10))
 
 
 def superQ(QClass):
@@ -73,3 +80,14 @@ def superQ(QClass):
 
 SuperQObject = superQ(QtCore.QObject)
 MetaQObject = type(QtCore.QObject)
+
+
+def isdeleted(obj):
+    """True if the C++ object wrapped by a Qt object was deleted.
+    """
+    if QT_API == QT_API_PYSIDE2:
+        import shiboken2
+        return not shiboken2.isValid(obj)
+
+    from PyQt5 import sip
+    return sip.isdeleted(obj)
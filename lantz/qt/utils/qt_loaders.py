@@ -62,15 +62,34 @@ import sys
 import types
 from functools import partial
 
-from distutils.version import LooseVersion
+
+def _version_tuple(version):
+    """Numeric components of a version string (e.g. '5.9.2' -> (5, 9, 2)).
+    Components are parsed up to the first non numeric one.
+    """
+    parts = []
+    for part in version.split('.'):
+        digits = ''
+        for char in part:
+            if not char.isdigit():
+                break
+            digits += char
+        if not digits:
+            break
+        parts.append(int(digits))
+        if len(digits) != len(part):
+            break
+    return tuple(parts)
+
 
 def check_version(a, b):
     """compare versions"""
-    try:
-        return LooseVersion(a) >= LooseVersion(b)
-    except TypeError:
+    # distutils (LooseVersion) is deprecated and slow to import.
+    a, b = _version_tuple(a), _version_tuple(b)
+    if not a:
         # assume unparseable versions are latest dev
         return True
+    return a >= b
 
 # Available APIs.
 QT_API_PYQT = 'pyqt'
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.qt.utils.recorder
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Stream rows of numbers to an append-only binary file during acquisition.
+
+    The file has a small header followed by the raw rows:
+
+    - magic: b'LANTZREC'
+    - header length: little endian uint32
+    - header: JSON (utf-8) with version, columns, units and dtype,
+      padded with spaces so that data starts at a multiple of 64 bytes.
+    - data: rows in C order (one value per column).
+
+    Data is flushed to disk in a background thread, so a run survives
+    a crash of the application (up to the flush interval). As the file
+    is append-only, another process can map it with `read_recording`
+    while the acquisition is still running.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import os
+import json
+import struct
+import threading
+
+import numpy as np
+
+
+MAGIC = b'LANTZREC'
+
+VERSION = 1
+
+_ALIGNMENT = 64
+
+
+class Recorder(object):
+    """Append rows to a binary file and flush it in the background.
+
+    Parameters
+    ----------
+    filename : str
+        path of the file. It is overwritten if it exists.
+    columns : iterable of str
+        names of the columns.
+    units : iterable of str or None
+        units of each column (use '' for dimensionless).
+        Quantities appended are converted to these units. (Default value = None)
+    flush_interval : float
+        seconds between background flushes. (Default value = 1.)
+    dtype : str
+        NumPy data type used to store the values. (Default value = '<f8')
+    """
+
+    def __init__(self, filename, columns, units=None, flush_interval=1., dtype='<f8'):
+        self.filename = filename
+        self.columns = tuple(columns)
+        self.units = tuple(units) if units else ('', ) * len(self.columns)
+        self.dtype = np.dtype(dtype)
+
+        if len(self.units) != len(self.columns):
+            raise ValueError('{} units given for {} columns'.format(len(self.units), len(self.columns)))
+
+        #: Number of rows recorded.
+        self.rows = 0
+
+        self._pending = []
+        self._pending_lock = threading.Lock()
+
+        #: Set (under _pending_lock) when close starts.
+        #: No rows are accepted afterwards.
+        self._closing_for_writes = False
+        self._write_lock = threading.Lock()
+
+        self._file = open(filename, 'wb')
+        self._file.write(_build_header(self.columns, self.units, self.dtype))
+        self._file.flush()
+
+        self._flush_interval = flush_interval
+        self._closing = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='recorder-' + os.path.basename(filename))
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def append(self, row):
+        """Append a single row.
+
+        Parameters
+        ----------
+        row : sequence
+            one value (number or Quantity) per column.
+        """
+        if len(row) != len(self.columns):
+            raise ValueError('Expected {} values, got {}'.format(len(self.columns), len(row)))
+
+        row = [value.m_as(units) if units and hasattr(value, 'm_as') else getattr(value, 'magnitude', value)
+               for value, units in zip(row, self.units)]
+
+        self._push(np.asarray(row, dtype=self.dtype).reshape(1, -1))
+
+    def extend(self, rows):
+        """Append multiple rows at once.
+
+        Parameters
+        ----------
+        rows : array like
+            magnitudes as an array of shape (columns, n), the same layout used
+            by :class:`lantz.qt.utils.buffers.RingBuffer`.
+        """
+        rows = np.asarray(rows, dtype=self.dtype)
+        if rows.ndim == 1:
+            rows = rows.reshape(-1, 1)
+        if rows.shape[0] != len(self.columns):
+            raise ValueError('Expected {} columns, got {}'.format(len(self.columns), rows.shape[0]))
+        self._push(np.ascontiguousarray(rows.T))
+
+    def _push(self, block):
+        with self._pending_lock:
+            if self._closing_for_writes:
+                raise ValueError('Cannot record in a closed recorder.')
+            self._pending.append(block)
+            self.rows += block.shape[0]
+
+    def flush(self, *args):
+        """Write pending rows to disk.
+        """
+        # Blocks are taken and written under the same lock, so concurrent
+        # flushes (e.g. from the background thread) keep their order.
+        with self._write_lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+
+            if self._file.closed:
+                return
+            for block in pending:
+                self._file.write(block.tobytes())
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def request_flush(self, *args):
+        """Ask the background thread to write pending rows now,
+        without waiting for it (nor for the disk).
+        """
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            if self._closing.is_set():
+                return
+            self.flush()
+
+    def close(self):
+        """Stop the background thread, flush pending rows and close the file.
+        """
+        with self._pending_lock:
+            if self._closing_for_writes:
+                return
+            self._closing_for_writes = True
+
+        self._closing.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        with self._write_lock:
+            self._file.close()
+
+
+class RecordingMixin(object):
+    """Adds recording of rows to a file and export of the per iteration
+    telemetry to backends with a `loop_done` signal and a `telemetry`
+    attribute (i.e. Loop and Scan).
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+        #: Recorder where rows given to `record` are written.
+        #: See start_recording.
+        self.recorder = None
+        self.loop_done.connect(self._flush_recorder)
+
+    def start_recording(self, filename, columns, units=None, flush_interval=1.):
+        """Start writing the rows given to `record` to a file.
+
+        See :mod:`lantz.qt.utils.recorder` for the file format.
+
+        Parameters
+        ----------
+        filename : str
+            path of the recording.
+        columns : iterable of str
+            names of the columns.
+        units : iterable of str
+            units of each column. (Default value = None)
+        flush_interval : float
+            seconds between flushes to disk. (Default value = 1.)
+
+        Returns
+        -------
+        Recorder
+        """
+        self.stop_recording()
+        self.recorder = Recorder(filename, columns, units, flush_interval)
+        return self.recorder
+
+    def stop_recording(self):
+        """Flush and close the current recording (if any).
+        """
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def record(self, *values):
+        """Record a row (usually called from the body).
+        Does nothing if there is no recording in progress.
+        """
+        if self.recorder is not None:
+            self.recorder.append(values)
+
+    def _flush_recorder(self, cancelled):
+        if self.recorder is not None:
+            self.recorder.request_flush()
+
+    def export_telemetry(self, filename):
+        """Save the per iteration telemetry of the current or last run.
+
+        See IterationTelemetry.export for the supported formats.
+        """
+        self.telemetry.export(filename)
+
+
+def _build_header(columns, units, dtype):
+    header = json.dumps({'version': VERSION,
+                         'columns': list(columns),
+                         'units': list(units),
+                         'dtype': dtype.str}).encode('utf-8')
+    fixed = len(MAGIC) + 4
+    padding = -(fixed + len(header)) % _ALIGNMENT
+    header += b' ' * padding
+    return MAGIC + struct.pack('<I', len(header)) + header
+
+
+def read_header(filename):
+    """Read the header of a recording.
+
+    Returns
+    -------
+    dict
+        header with the data offset added as 'offset'.
+    """
+    with open(filename, 'rb') as fi:
+        magic = fi.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError('{} is not a lantz recording.'.format(filename))
+        length, = struct.unpack('<I', fi.read(4))
+        header = json.loads(fi.read(length).decode('utf-8'))
+
+    header['offset'] = len(MAGIC) + 4 + length
+    return header
+
+
+def read_recording(filename):
+    """Map a recording into memory (without copying).
+
+    Can be used while the recording is still in progress;
+    call it again to see new rows.
+
+    Returns
+    -------
+    dict, numpy.ndarray
+        the header and an array of shape (rows, columns).
+    """
+    header = read_header(filename)
+    dtype = np.dtype(header['dtype'])
+    ncols = len(header['columns'])
+
+    # A row might be partially written. Only complete rows are mapped.
+    nrows = (os.path.getsize(filename) - header['offset']) // (dtype.itemsize * ncols)
+    if not nrows:
+        return header, np.empty((0, ncols), dtype=dtype)
+
+    return header, np.memmap(filename, dtype=dtype, mode='r',
+                             offset=header['offset'], shape=(nrows, ncols))
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.qt.utils.startup
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Optional instrumentation of the start of lantz.qt applications.
+
+    Set the environment variable LANTZ_QT_STARTUP_PROFILE=1 to record
+    the time spent in each initialization phase (binding selection,
+    loadUi setup, imports of lantz.qt submodules, ...) and in the import
+    of each module. A report is printed to stderr when the interpreter
+    exits, or on demand with `report()`.
+
+    This module must be cheap to import and therefore only depends
+    on the standard library.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import os
+import sys
+import time
+import atexit
+import threading
+import contextlib
+import importlib.util
+
+#: True if startup profiling is enabled.
+ENABLED = os.environ.get('LANTZ_QT_STARTUP_PROFILE', '').lower() in ('1', 'true', 'yes')
+
+_ORIGIN = time.perf_counter()
+
+#: List[(depth, name, start, duration)] of the recorded phases.
+_PHASES = []
+
+#: Dict[module name, seconds] inclusive import time of each module.
+_IMPORTS = {}
+
+_LOCAL = threading.local()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Context manager measuring an initialization phase.
+
+    Phases can be nested. Nothing is recorded if profiling is disabled.
+    """
+    if not ENABLED:
+        yield
+        return
+
+    depth = getattr(_LOCAL, 'depth', 0)
+    _LOCAL.depth = depth + 1
+    entry = [depth, name, time.perf_counter() - _ORIGIN, None]
+    _PHASES.append(entry)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry[3] = time.perf_counter() - start
+        _LOCAL.depth = depth
+
+
+def lazy_attributes(package, names):
+    """Build the module level __getattr__ and __dir__ of a package
+    that imports its submodules on first access.
+
+    Parameters
+    ----------
+    package : str
+        name of the package (i.e. its __name__).
+    names : dict
+        maps each public name to the relative name of the submodule
+        providing it (e.g. {'Loop': '.loop'}).
+
+    Returns
+    -------
+    (callable, callable)
+        __getattr__ and __dir__ functions to be assigned in the package.
+        Names that are not in `names` but are submodules of the package
+        are imported, so `import package` followed by `package.submodule`
+        works as with eager imports.
+    """
+    module = sys.modules[package]
+
+    def __getattr__(name):
+        module_name = names.get(name)
+        if module_name is None:
+            if name.startswith('__') or importlib.util.find_spec('.' + name, package) is None:
+                raise AttributeError('module {!r} has no attribute {!r}'.format(package, name))
+            # Importing a submodule also binds it in the package.
+            with phase('import ' + package + '.' + name):
+                return importlib.import_module('.' + name, package)
+
+        with phase('import ' + package + module_name + ' (for ' + name + ')'):
+            value = getattr(importlib.import_module(module_name, package), name)
+
+        setattr(module, name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(module)) | set(names))
+
+    return __getattr__, __dir__
+
+
+class _TimedLoader(object):
+    """Wraps a module loader to measure the time to create and execute modules.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+
+    def create_module(self, spec):
+        # Extension modules do most of their work here.
+        start = time.perf_counter()
+        try:
+            return self._loader.create_module(spec)
+        finally:
+            _IMPORTS[spec.name] = time.perf_counter() - start
+
+    def exec_module(self, module):
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            _IMPORTS[module.__name__] = (_IMPORTS.get(module.__name__, 0.) +
+                                         time.perf_counter() - start)
+
+    def __getattr__(self, item):
+        return getattr(self._loader, item)
+
+
+class _TimingFinder(object):
+    """Meta path finder that delegates to the other finders
+    and wraps the loaders they return with _TimedLoader.
+    """
+
+    def find_spec(self, fullname, path=None, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                    spec.loader = _TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+def report(file=None, top=25):
+    """Print the recorded phases and the slowest imports.
+
+    Parameters
+    ----------
+    file :
+        stream to print to. If None, sys.stderr is used. (Default value = None)
+    top : int
+        number of module imports to show. (Default value = 25)
+    """
+    file = file or sys.stderr
+
+    print('lantz.qt startup profile', file=file)
+    print('  phases (start, duration in ms)', file=file)
+    for depth, name, start, duration in _PHASES:
+        duration = '...' if duration is None else '{:8.1f}'.format(duration * 1000)
+        print('  {:8.1f} {} {}{}'.format(start * 1000, duration, '  ' * depth, name), file=file)
+
+    if _IMPORTS:
+        print('  slowest imports (inclusive, in ms)', file=file)
+        for name, duration in sorted(_IMPORTS.items(), key=lambda item: -item[1])[:top]:
+            print('  {:8.1f} {}'.format(duration * 1000, name), file=file)
+
+
+if ENABLED:
+    sys.meta_path.insert(0, _TimingFinder())
+    atexit.register(report)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.qt.utils.telemetry
+    ~~~~~~~~~~~~~~~~~~~~~~~~
+
+    Per iteration timing records of Loop and Scan.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import json
+
+import numpy as np
+
+from .buffers import RingBuffer
+
+
+#: Names of the telemetry columns. All times are in seconds.
+#:   counter - iteration number.
+#:   wall - start of the iteration relative to the start of the first one.
+#:   latency - delay between the scheduled and the actual start.
+#:   dispatch - time spent emitting the iteration signal.
+#:   pre_body - time spent in _pre_body (NaN if not applicable).
+#:   body - time spent in body.
+#:   post_body - time spent in _post_body (NaN if not applicable).
+#:   total - duration of the iteration.
+COLUMNS = ('counter', 'wall', 'latency', 'dispatch',
+           'pre_body', 'body', 'post_body', 'total')
+
+#: Columns for which summary statistics are calculated.
+DURATIONS = COLUMNS[2:]
+
+#: Percentiles reported by IterationTelemetry.summary.
+PERCENTILES = (50, 95, 99)
+
+
+class IterationTelemetry(object):
+    """Stores the timing of each iteration of a loop in a RingBuffer.
+
+    Parameters
+    ----------
+    capacity : int or None
+        number of iterations to keep. If None, all are kept.
+        (Default value = 10000)
+    """
+
+    def __init__(self, capacity=10000):
+        self._buffer = RingBuffer(len(COLUMNS), capacity, chunk_size=1024)
+        self._origin = None
+
+    def __len__(self):
+        return len(self._buffer)
+
+    @property
+    def total(self):
+        """Number of iterations recorded, including those discarded."""
+        return self._buffer.total
+
+    def clear(self):
+        self._buffer.clear()
+        self._origin = None
+
+    def add(self, counter, start, latency, dispatch, pre_body, body, post_body, total):
+        """Record an iteration.
+
+        Parameters
+        ----------
+        counter : int
+            iteration number.
+        start : float
+            time.perf_counter() at the start of the iteration.
+        latency, dispatch, pre_body, body, post_body, total : float
+            durations in seconds (see COLUMNS).
+        """
+        if self._origin is None:
+            self._origin = start
+        self._buffer.append((counter, start - self._origin, latency, dispatch,
+                             pre_body, body, post_body, total))
+
+    def column(self, name):
+        """Return a view of a column, from oldest to newest iteration.
+        """
+        return self._buffer.column(COLUMNS.index(name))
+
+    def to_array(self):
+        """Return a copy of the records as a structured array.
+        """
+        view = self._buffer.view()
+        out = np.empty(view.shape[1], dtype=[(name, float) for name in COLUMNS])
+        for ndx, name in enumerate(COLUMNS):
+            out[name] = view[ndx]
+        return out
+
+    def summary(self, percentiles=PERCENTILES):
+        """Summary statistics of the recorded durations.
+
+        Parameters
+        ----------
+        percentiles : sequence of float
+            percentiles to calculate. (Default value = PERCENTILES)
+
+        Returns
+        -------
+        dict
+            For each column in DURATIONS with data, a dict with
+            mean, max and 'p<percentile>' keys.
+            Also contains the number of `iterations`.
+        """
+        out = {'iterations': self.total}
+
+        if not len(self._buffer):
+            return out
+
+        view = self._buffer.view()
+        for name in DURATIONS:
+            values = view[COLUMNS.index(name)]
+            values = values[~np.isnan(values)]
+            if not len(values):
+                continue
+            stats = {'p{:g}'.format(p): float(v)
+                     for p, v in zip(percentiles, np.percentile(values, percentiles))}
+            stats['mean'] = float(values.mean())
+            stats['max'] = float(values.max())
+            out[name] = stats
+
+        return out
+
+    def export(self, filename):
+        """Save the records to a file.
+
+        The format is chosen from the extension: .npy (structured array),
+        .json (summary and columns) or otherwise CSV with a header.
+        """
+        data = self.to_array()
+        if filename.endswith('.npy'):
+            np.save(filename, data)
+        elif filename.endswith('.json'):
+            with open(filename, 'w', encoding='utf-8') as fo:
+                json.dump({'summary': self.summary(),
+                           'columns': {name: [None if np.isnan(v) else float(v) for v in data[name]]
+                                       for name in COLUMNS}},
+                          fo, indent=2)
+        else:
+            np.savetxt(filename, self._buffer.view().T, fmt='%.9g',
+                       delimiter=',', header=','.join(COLUMNS), comments='')
+
+
+def format_summary(summary, columns=('latency', 'dispatch', 'pre_body', 'body', 'post_body')):
+    """Format a summary as short text lines (times in ms) for display.
+    """
+    lines = []
+    for name in columns:
+        stats = summary.get(name)
+        if stats is None:
+            continue
+        lines.append('{:9s} p50 {:8.3f}  p95 {:8.3f}  p99 {:8.3f}  max {:8.3f} ms'.format(
+            name, stats['p50'] * 1e3, stats['p95'] * 1e3, stats['p99'] * 1e3, stats['max'] * 1e3))
+    return '\n'.join(lines)
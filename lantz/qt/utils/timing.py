@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.qt.utils.timing
+    ~~~~~~~~~~~~~~~~~~~~~
+
+    Timing statistics of periodic tasks.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import time
+from bisect import bisect_right
+
+
+#: Bin edges (in seconds) of the timing histograms.
+#: Values below the first edge or above the last one are counted
+#: in the first or last bin respectively.
+HISTOGRAM_EDGES = (-1e-2, -1e-3, -1e-4, -1e-5, 0.,
+                   1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4,
+                   1e-3, 2e-3, 5e-3, 1e-2, 2e-2, 5e-2, 1e-1, 1.)
+
+
+class Histogram(object):
+    """A histogram with fixed bin edges and constant time updates.
+
+    Parameters
+    ----------
+    edges : sequence of float
+        bin edges in increasing order. (Default value = HISTOGRAM_EDGES)
+    """
+
+    def __init__(self, edges=HISTOGRAM_EDGES):
+        self.edges = tuple(edges)
+
+        #: counts[i] is the number of values in [edges[i-1], edges[i]).
+        #: counts[0] counts values below edges[0]
+        #: and counts[-1] values above edges[-1].
+        self.counts = [0] * (len(self.edges) + 1)
+
+        self.total = 0
+        self.minimum = float('inf')
+        self.maximum = float('-inf')
+        self._sum = 0.
+
+    def add(self, value):
+        self.counts[bisect_right(self.edges, value)] += 1
+        self.total += 1
+        self._sum += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    @property
+    def mean(self):
+        return self._sum / self.total if self.total else 0.
+
+    def to_dict(self):
+        return {'edges': list(self.edges),
+                'counts': list(self.counts),
+                'total': self.total,
+                'mean': self.mean,
+                'min': self.minimum if self.total else None,
+                'max': self.maximum if self.total else None}
+
+
+class LoopTiming(object):
+    """Jitter, drift and overrun statistics of a periodic loop.
+
+    For the k-th iteration starting at t_k, with t_0 the start of the first
+    iteration and T the interval:
+
+    - jitter: (t_k - t_(k-1)) - T, the error of each period.
+    - drift: t_k - (t_0 + k * T), the accumulated offset from the ideal grid.
+    - overrun: the time in excess of T taken by an iteration (only
+      iterations that took longer than T are counted).
+
+    Parameters
+    ----------
+    interval : float
+        the requested interval in seconds.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.jitter = Histogram()
+        self.drift = Histogram()
+        self.overrun = Histogram()
+
+        #: Number of iterations.
+        self.iterations = 0
+
+        #: Last drift value.
+        self.last_drift = 0.
+
+        self._first = None
+        self._previous = None
+
+    def iteration_started(self, counter, now=None):
+        """Record the start of an iteration.
+
+        Parameters
+        ----------
+        counter : int
+            iteration number.
+        now : float
+            time.perf_counter() at the start of the iteration. (Default value = None)
+        """
+        if now is None:
+            now = time.perf_counter()
+
+        if self._first is None:
+            self._first = now - counter * self.interval
+        else:
+            self.jitter.add(now - self._previous - self.interval)
+
+        self.last_drift = now - (self._first + counter * self.interval)
+        self.drift.add(self.last_drift)
+
+        self._previous = now
+        self.iterations += 1
+
+    def iteration_finished(self, duration):
+        """Record the duration of an iteration (in seconds).
+        """
+        if self.interval and duration > self.interval:
+            self.overrun.add(duration - self.interval)
+
+    def to_dict(self):
+        """Summary and histograms as a JSON serializable dict.
+        """
+        return {'interval': self.interval,
+                'iterations': self.iterations,
+                'drift': self.last_drift,
+                'overruns': self.overrun.total,
+                'histograms': {'jitter': self.jitter.to_dict(),
+                               'drift': self.drift.to_dict(),
+                               'overrun': self.overrun.to_dict()}}
+
+
+def wait_until(deadline, event=None, spin=2e-3):
+    """Wait until time.perf_counter() reaches deadline.
+
+    Sleeps while the remaining time is longer than `spin` and then
+    busy waits, trading CPU time for sub-millisecond accuracy.
+
+    Parameters
+    ----------
+    deadline : float
+        time.perf_counter() value.
+    event : threading.Event
+        if given, the wait is interrupted when the event is set. (Default value = None)
+    spin : float
+        remaining time (in seconds) below which the wait becomes a busy wait.
+        (Default value = 2e-3)
+
+    Returns
+    -------
+    bool
+        False if the wait was interrupted by the event.
+    """
+    perf_counter = time.perf_counter
+    while True:
+        remaining = deadline - perf_counter()
+        if remaining <= 0:
+            return True
+        if remaining > spin:
+            if event is None:
+                time.sleep(remaining - spin)
+            elif event.wait(remaining - spin):
+                return False
+        elif event is not None and event.is_set():
+            return False
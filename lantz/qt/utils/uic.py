@@ -1,6 +1,8 @@
 # Adapted from the qtpy project
 # See https://raw.githubusercontent.com/spyder-ide/qtpy/master/qtpy/uic.py
 
+import os
+
 from . import qt_loaders
 
 
@@ -101,7 +103,7 @@ def build_loadUi(QT_API):
             This mimics the behaviour of :func:`PyQt4.uic.loadUi`.
             """
 
-            def __init__(self, baseinstance, customWidgets=None):
+            def __init__(self, baseinstance=None, customWidgets=None):
                 """
                 Create a loader for the given ``baseinstance``.
 
@@ -117,9 +119,12 @@ def build_loadUi(QT_API):
                 ``parent`` is the parent object of this loader.
                 """
 
-                QUiLoader.__init__(self, baseinstance)
+                # The loader is reused for many files, so it is not
+                # parented to the (first) base instance.
+                QUiLoader.__init__(self)
 
                 self.baseinstance = baseinstance
+                self.default_working_directory = self.workingDirectory()
 
                 if customWidgets is None:
                     self.customWidgets = {}
@@ -163,6 +168,25 @@ def build_loadUi(QT_API):
 
                     return widget
 
+        #: Dict[(path, mtime), Dict[str, type]] custom widgets of each ui file.
+        _custom_widgets_cache = {}
+
+        def _get_custom_widgets_cached(ui_file):
+            """
+            Return the custom widget classes of a ui file, parsing it only
+            the first time (or after it changes).
+            """
+            path = os.path.abspath(ui_file)
+            key = (path, os.stat(path).st_mtime_ns)
+            value = _custom_widgets_cache.get(key)
+            if value is None:
+                value = _custom_widgets_cache[key] = _get_custom_widgets(path)
+            return value
+
+        #: Idle loaders. A loader is busy while loading a file, and loading
+        #: a file can trigger another load (e.g. from a custom widget).
+        _loaders = []
+
         def _get_custom_widgets(ui_file):
             """
             This function is used to parse a ui file and look for the <customwidgets>
@@ -185,7 +209,7 @@ def build_loadUi(QT_API):
 
             custom_widget_classes = {}
 
-            for custom_widget in custom_widgets.getchildren():
+            for custom_widget in list(custom_widgets):
 
                 cw_class = custom_widget.find('class').text
                 cw_header = custom_widget.find('header').text
@@ -220,14 +244,25 @@ def build_loadUi(QT_API):
             """
 
             # We parse the UI file and import any required custom widgets
-            customWidgets = _get_custom_widgets(uifile)
+            # (only the first time each file is loaded).
+            customWidgets = _get_custom_widgets_cached(uifile)
 
-            loader = UiLoader(baseinstance, customWidgets)
+            loader = _loaders.pop() if _loaders else UiLoader()
+            loader.baseinstance = baseinstance
+            loader.customWidgets = customWidgets
+
+            try:
+                if workingDirectory is not None:
+                    loader.setWorkingDirectory(workingDirectory)
+                else:
+                    # Reused loaders keep the directory of a previous load.
+                    loader.setWorkingDirectory(loader.default_working_directory)
 
-            if workingDirectory is not None:
-                loader.setWorkingDirectory(workingDirectory)
+                widget = loader.load(uifile)
+            finally:
+                loader.baseinstance = None
+                _loaders.append(loader)
 
-            widget = loader.load(uifile)
             QMetaObject.connectSlotsByName(widget)
             return widget
 
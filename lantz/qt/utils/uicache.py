@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.qt.utils.uicache
+    ~~~~~~~~~~~~~~~~~~~~~~
+
+    Compile Qt Designer (.ui) files once and reuse the generated classes.
+
+    Parsing a .ui file and building the widgets through the uic interpreter
+    is slow. Here, each file is compiled to Python (as pyuic does) the first
+    time it is used and the generated class is kept in memory. The generated
+    source is also stored in a cache directory, so later runs of the
+    application skip the compilation. Entries are keyed on the absolute
+    path and the modification time of the file.
+
+    Only available with PyQt5. With other bindings, `ui_type` returns None
+    and the caller should use `loadUi`.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import io
+import os
+import hashlib
+import threading
+from xml.etree.ElementTree import parse
+
+from ..config import UI_CACHE_DIR
+from ..log import LOGGER
+from .qt import QtGui, QT_API
+from .qt_loaders import QT_API_PYQT5
+
+#: Dict[(path, mtime), (form class, base class)]
+_TYPES = {}
+_TYPES_LOCK = threading.Lock()
+
+_BASE_MARK = '# lantz ui base class: '
+
+
+def _compile(filename):
+    """Return the Python source generated for a .ui file
+    and the name of its top level widget class.
+    """
+    from PyQt5 import uic
+
+    code = io.StringIO()
+    uic.compileUi(filename, code)
+
+    base_name = parse(filename).getroot().find('widget').get('class')
+    return code.getvalue(), base_name
+
+
+def _cache_filename(path, mtime):
+    from PyQt5.QtCore import PYQT_VERSION_STR
+
+    # The generated code depends on the PyQt version.
+    key = '{}|{}|{}'.format(path, mtime, PYQT_VERSION_STR).encode('utf-8')
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(UI_CACHE_DIR, '{}_{}.py'.format(name, hashlib.sha1(key).hexdigest()[:16]))
+
+
+def _read_cached(cache_filename):
+    try:
+        with open(cache_filename, 'r', encoding='utf-8') as fi:
+            first = fi.readline()
+            source = fi.read()
+    except OSError:
+        return None
+
+    if not first.startswith(_BASE_MARK):
+        return None
+
+    return source, first[len(_BASE_MARK):].strip()
+
+
+def _write_cached(cache_filename, source, base_name):
+    try:
+        os.makedirs(UI_CACHE_DIR, exist_ok=True)
+        tmp = '{}.{}.tmp'.format(cache_filename, os.getpid())
+        with open(tmp, 'w', encoding='utf-8') as fo:
+            fo.write(_BASE_MARK + base_name + '\n')
+            fo.write(source)
+        os.replace(tmp, cache_filename)
+    except OSError as ex:
+        LOGGER.debug('Could not store compiled ui file in {}: {}'.format(cache_filename, ex))
+
+
+def _build_type(path, mtime):
+    cache_filename = _cache_filename(path, mtime) if UI_CACHE_DIR else None
+
+    cached = _read_cached(cache_filename) if cache_filename else None
+    if cached is None:
+        LOGGER.debug('Compiling ui file {}'.format(path))
+        source, base_name = _compile(path)
+        if cache_filename:
+            _write_cached(cache_filename, source, base_name)
+    else:
+        LOGGER.debug('Using compiled ui file {} for {}'.format(cache_filename, path))
+        source, base_name = cached
+
+    namespace = {'__name__': 'lantz_ui_' + os.path.splitext(os.path.basename(path))[0]}
+    exec(compile(source, cache_filename or path, 'exec'), namespace)
+
+    form_class = next(value for key, value in namespace.items()
+                      if key.startswith('Ui_') and isinstance(value, type))
+
+    return form_class, getattr(QtGui, base_name, QtGui.QWidget)
+
+
+def ui_type(filename):
+    """Return the form class and the base class for a .ui file,
+    compiling it only if it was not compiled before (or changed since).
+
+    Returns
+    -------
+    (type, type) or None
+        None if the Qt binding in use is not supported.
+    """
+    if QT_API != QT_API_PYQT5:
+        return None
+
+    path = os.path.abspath(filename)
+    key = (path, os.stat(path).st_mtime_ns)
+
+    with _TYPES_LOCK:
+        value = _TYPES.get(key)
+        if value is None:
+            value = _TYPES[key] = _build_type(*key)
+        return value
+
+
+def load_ui(filename, baseinstance=None):
+    """Equivalent to `loadUi` using the compiled ui cache when possible.
+
+    Parameters
+    ----------
+    filename : str
+        path of the .ui file.
+    baseinstance : QWidget
+        if given, the user interface is created within it.
+        It must be an instance of the top level class of the file.
+        (Default value = None)
+
+    Returns
+    -------
+    QWidget
+        baseinstance or a new instance of the top level class.
+        Child widgets are available as attributes.
+    """
+    value = ui_type(filename)
+    if value is None:
+        return QtGui.loadUi(filename, baseinstance)
+
+    form_class, base_class = value
+    widget = base_class() if baseinstance is None else baseinstance
+
+    form = form_class()
+    form.setupUi(widget)
+
+    # As loadUi, make the children available as attributes of the widget.
+    for name, child in vars(form).items():
+        setattr(widget, name, child)
+
+    return widget
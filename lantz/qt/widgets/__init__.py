@@ -13,4 +13,4 @@
 from . import feat, nonnumeric, numeric
 from .common import WidgetMixin, ChildrenWidgets
 from .initialize import InitializeWindow, InitializeDialog
-from .testgui import DriverTestWidget, SetupTestWidget
\ No newline at end of file
+from .testgui import DriverTestWidget, DriverTestTableWidget, SetupTestWidget
@@ -14,7 +14,8 @@ from lantz.core.helpers import UNSET, MISSING
 from lantz.core.feat import FeatProxy, DictFeatProxy, Feat, DictFeat
 from ..log import LOGGER
 from ..utils import LANTZ_BUILDING_DOCS
-from ..utils.qt import QtGui
+from ..utils.qt import QtCore, QtGui
+from .featio import feat_reader, feat_writer
 
 
 def register_wrapper(cls):
@@ -86,6 +87,43 @@ class WidgetMixin(object):
 
     _update_on_change = False
 
+    #: If True, reads requested by the widget (e.g. pressing 'r') are done
+    #: in a worker thread and the value is delivered through on_feat_value_changed.
+    #: Only used for drivers wrapped in a QObject (see wrap_driver_cls), whose
+    #: _changed signals are queued to the GUI thread. Reads of plain drivers
+    #: always block the calling thread, as their _changed callbacks would
+    #: otherwise update the widgets from the worker thread.
+    #: If False, reads block the calling thread.
+    async_read = True
+
+    #: If True, writes triggered by value changes (update_on_change) or by
+    #: request_value_to_feat are done in a worker thread. Pending writes to the
+    #: same feat are collapsed and only the latest value is written.
+    #: As async_read, only used for drivers wrapped in a QObject.
+    #: If False, writes block the calling thread.
+    async_write = True
+
+    #: Minimum time in seconds between consecutive writes to the feat
+    #: (only for asynchronous writes).
+    min_write_interval = 0.
+
+    #: Incremented on each read or write request of the widget.
+    _io_sequence = 0
+
+    #: Value of _io_sequence for the most recent write request.
+    #: Results of reads requested before it are stale and dropped.
+    _write_sequence = 0
+
+    #: True while the widget is updated with a value from the driver,
+    #: so that the update is not written back.
+    _setting_from_feat = False
+
+    #: Number of batch reads (see DriverTestWidget.refresh) in progress
+    #: that include this widget. While positive, the _changed signals
+    #: emitted by the reads are ignored: the widget is updated once
+    #: with the batch result.
+    _batch_reads = 0
+
     def keyPressEvent(self, event):
         """When 'u' is pressed, request new units.
         When 'r' is pressed, get new value from the driver.
@@ -94,7 +132,7 @@ class WidgetMixin(object):
 
         if event.text() == 'r':
             # This should also trigger a widget update if necessary.
-            self.value_from_feat()
+            self.request_value_from_feat()
 
     def value(self):
         """Get widget value."""
@@ -126,6 +164,42 @@ class WidgetMixin(object):
         else:
             return getattr(self._lantz_target, self.feat.name)
 
+    def request_value_from_feat(self):
+        """Request the current Feat value from the driver without blocking.
+
+        The widget is updated when the value arrives. Requests for a feat
+        that is already being read are merged.
+        """
+        if self._feat is None or self._lantz_target is None:
+            return
+
+        if not (self.async_read and self._target_is_qobject()):
+            self._on_feat_read(self.value_from_feat(), self._feat_key)
+            return
+
+        self._io_sequence += 1
+        sequence = self._io_sequence
+        feat_reader().read(self._lantz_target, self._feat, self._feat_key,
+                           lambda value, key: self._on_feat_read(value, key, sequence),
+                           receiver=self)
+
+    def _target_is_qobject(self):
+        """True if the driver emits its _changed signals as Qt signals,
+        which can be safely emitted from a worker thread.
+        """
+        return isinstance(self._lantz_target, QtCore.QObject)
+
+    def _on_feat_read(self, value, key, sequence=None):
+        if sequence is not None and sequence < self._write_sequence:
+            # A newer value was requested to be written after this read
+            # was issued. Showing the old value would revert the edit.
+            return
+
+        if isinstance(self._feat, DictFeat):
+            self.on_feat_value_changed(value, key=key)
+        else:
+            self.on_feat_value_changed(value)
+
     def value_to_feat(self):
         """Update the Feat value of the driver with the widget value."""
         if self._feat is None or self._lantz_target is None:
@@ -136,6 +210,23 @@ class WidgetMixin(object):
         else:
             setattr(self._lantz_target, self.feat.name, self.value())
 
+    def request_value_to_feat(self):
+        """Request the Feat value of the driver to be updated with the widget value,
+        without blocking.
+        """
+        if self._feat is None or self._lantz_target is None:
+            return
+
+        self._io_sequence += 1
+        self._write_sequence = self._io_sequence
+
+        if not (self.async_write and self._target_is_qobject()):
+            self.value_to_feat()
+            return
+
+        feat_writer().write(self._lantz_target, self._feat, self._feat_key, self.value(),
+                            self.min_write_interval)
+
     @property
     def update_on_change(self):
         return self._update_on_change
@@ -164,16 +255,24 @@ class WidgetMixin(object):
         """
         if key is not MISSING and key != self._feat_key:
             return
+        if self._setting_from_feat:
+            return
         if self._update_on_change:
-            self.value_to_feat()
+            self.request_value_to_feat()
 
     def on_feat_value_changed(self, value, old_value=UNSET, key=MISSING):
         """When the driver value is changed, update the widget if necessary.
         """
+        if self._batch_reads:
+            return
         if key is not MISSING and key != self._feat_key:
             return
         if self.value() != value:
-            self.setValue(value)
+            self._setting_from_feat = True
+            try:
+                self.setValue(value)
+            finally:
+                self._setting_from_feat = False
 
     @property
     def feat_key(self):
@@ -187,7 +286,7 @@ class WidgetMixin(object):
         self._feat_key = value
         if self._lantz_target:
             getattr(self._lantz_target, self._feat.name + '_changed').connect(self.on_feat_value_changed)
-        self.value_from_feat()
+        self.request_value_from_feat()
 
     @property
     def lantz_target(self):
@@ -206,7 +305,7 @@ class WidgetMixin(object):
             self._feat_signal = getattr(self._lantz_target, self._feat.name + '_changed')
             self._feat_signal.connect(self.on_feat_value_changed)
 
-            self.value_from_feat()
+            self.request_value_from_feat()
             self.valueChanged.connect(self.on_widget_value_changed)
 
     def bind_feat(self, feat):
@@ -291,9 +390,42 @@ class WidgetMixin(object):
         return widget
 
 
+class _TreeWatcher(QtCore.QObject):
+    """Event filter that invalidates the index of a ChildrenWidgets
+    when a child is added to or removed from a watched object,
+    or when a watched object is renamed.
+    """
+
+    def __init__(self, owner, parent):
+        super().__init__(parent)
+        self._owner = owner
+
+    def watch(self, obj):
+        obj.installEventFilter(self)
+        try:
+            obj.objectNameChanged.connect(self.on_renamed, QtCore.Qt.UniqueConnection)
+        except TypeError:
+            # Already connected in a previous build.
+            pass
+
+    @QtCore.Slot(str)
+    def on_renamed(self, name):
+        self._owner.invalidate()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QtCore.QEvent.ChildAdded, QtCore.QEvent.ChildRemoved):
+            self._owner.invalidate()
+        return False
+
+
 class ChildrenWidgets(object):
     """Convenience class to iterate children.
 
+    The widget tree is indexed by name and by qualified name on first use.
+    The index is discarded when a child is added to or removed from any
+    widget in the tree, or when a widget is renamed, so lookups do not
+    walk the tree again while it does not change.
+
     Parameters
     ----------
     parent :
@@ -304,20 +436,84 @@ class ChildrenWidgets(object):
     def __init__(self, parent):
         self.parent = parent
 
-    def __getattr__(self, item):
-        return self.parent.findChild((QtGui.QWidget, ), item)
+        #: List[(name, qualified name, widget)] in iteration order or None.
+        self._items = None
 
-    def __iter__(self):
-        pending = [self.parent, ]
-        qualname = {self.parent: self.parent.objectName()}
+        #: Dict[name, widget], same precedence as findChild.
+        self._by_name = None
+
+        #: Dict[qualified name, widget]
+        self._by_qualname = None
+
+        self._watcher = None
+
+    def invalidate(self):
+        """Discard the index. It will be rebuilt on the next lookup."""
+        self._items = self._by_name = self._by_qualname = None
+
+    def _build(self):
+        parent = self.parent
+
+        if self._watcher is None:
+            self._watcher = _TreeWatcher(self, parent)
+
+        items = []
+        pending = [parent, ]
+        qualname = {parent: parent.objectName()}
         while pending:
             obj = pending.pop()
+            self._watcher.watch(obj)
             for child in obj.children():
                 if not isinstance(child, QtGui.QWidget):
                     continue
                 qualname[child] = qualname[obj] + '.' + child.objectName()
                 pending.append(child)
-                yield child.objectName(), qualname[child], child
+                items.append((child.objectName(), qualname[child], child))
+
+        # findChild looks at all direct children before
+        # recursing into each of them.
+        by_name = {}
+
+        def _add(obj):
+            children = [child for child in obj.children() if isinstance(child, QtGui.QWidget)]
+            for child in children:
+                by_name.setdefault(child.objectName(), child)
+            for child in children:
+                _add(child)
+
+        _add(parent)
+
+        self._items = items
+        self._by_name = by_name
+        self._by_qualname = {qualname: widget for _, qualname, widget in items}
+
+    def __getattr__(self, item):
+        if item.startswith('__') or item in ('parent', '_items', '_by_name', '_by_qualname', '_watcher'):
+            raise AttributeError(item)
+
+        if self._by_name is None:
+            self._build()
+
+        widget = self._by_name.get(item)
+        if widget is not None:
+            return widget
+
+        # A miss is resolved by Qt without walking the tree
+        # in Python, so probing optional names stays cheap.
+        return self.parent.findChild(QtGui.QWidget, item)
+
+    def by_qualname(self, qualname):
+        """Return the widget with a given qualified name
+        (names from the parent joined by dots) or None.
+        """
+        if self._by_qualname is None:
+            self._build()
+        return self._by_qualname.get(qualname)
+
+    def __iter__(self):
+        if self._items is None:
+            self._build()
+        return iter(self._items)
 
     @classmethod
     def patch(cls, parent):
@@ -14,8 +14,8 @@ import inspect
 import json
 
 from ..log import LOGGER
-from ..utils.docscrape import NumpyDocString
 from ..utils.qt import QtCore, QtGui
+from .featio import action_runner, CANCEL_ARGUMENT
 
 
 class ArgumentsInputDialog(QtGui.QDialog):
@@ -37,6 +37,10 @@ class ArgumentsInputDialog(QtGui.QDialog):
     Or you can call it to enter the parameters of a function and run it:
     >>> args = ArgumentsInputDialog.run(func, parent)
 
+    or run it in a worker thread without blocking the GUI
+    (only for drivers wrapped in a QObject, see runs_in_worker):
+    >>> handle = ArgumentsInputDialog.run_async(func, parent)
+
     """
     def __init__(self, argspec, parent=None, window_title='Function arguments', doc=None):
         super().__init__(parent)
@@ -129,6 +133,44 @@ class ArgumentsInputDialog(QtGui.QDialog):
                                        QtGui.QMessageBox.Ok,
                                        QtGui.QMessageBox.NoButton)
 
+    @staticmethod
+    def run_async(func, parent=None, callback=None):
+        """Display a dialog for a function and run it in a worker thread
+        (if the driver is wrapped in a QObject, see runs_in_worker).
+
+        Errors are shown in a message box.
+
+        Parameters
+        ----------
+        func : callable
+            the action.
+        parent : PyQt Widget
+            parent widget. (Default value = None)
+        callback : callable
+            called in the GUI thread when the action is done as
+            callback(handle, result, exception, elapsed). (Default value = None)
+
+        Returns
+        -------
+        ActionHandle or None
+            None if the dialog was cancelled.
+        """
+
+        arguments = ArgumentsInputDialog.get_params(func, parent)
+        if arguments is None:
+            return None
+
+        def _done(handle, result, ex, elapsed):
+            if ex is not None:
+                QtGui.QMessageBox.critical(parent, 'Lantz',
+                                           'Instrument error while calling {}'.format(handle.name),
+                                           QtGui.QMessageBox.Ok,
+                                           QtGui.QMessageBox.NoButton)
+            if callback is not None:
+                callback(handle, result, ex, elapsed)
+
+        return action_runner().run(func, arguments, _done, receiver=parent)
+
     @staticmethod
     def get_params(func, parent=None):
         """Creates and display a UnitInputDialog and return new units.
@@ -137,10 +179,13 @@ class ArgumentsInputDialog(QtGui.QDialog):
         wrapped = getattr(func, '__wrapped__', func)
         name = wrapped.__name__
         doc = wrapped.__doc__
-        argspec = inspect.getargspec(wrapped)
+        argspec = _without_argument(inspect.getfullargspec(wrapped), CANCEL_ARGUMENT)
 
         arguments = {}
         if len(argspec.args) > 1:
+            # Imported here as it is only needed to show the dialog.
+            from ..utils.docscrape import NumpyDocString
+
             doc = NumpyDocString(doc).get('Parameters', [])
             doc = {k: '\n'.join(v) for (k, _, v) in doc}
 
@@ -153,3 +198,27 @@ class ArgumentsInputDialog(QtGui.QDialog):
             arguments = dialog.arguments
 
         return arguments
+
+
+def _without_argument(argspec, name):
+    """Return a FullArgSpec without the argument name (and its default).
+    """
+    if name in argspec.kwonlyargs:
+        kwonlydefaults = dict(argspec.kwonlydefaults or {})
+        kwonlydefaults.pop(name, None)
+        return argspec._replace(kwonlyargs=[arg for arg in argspec.kwonlyargs if arg != name],
+                                kwonlydefaults=kwonlydefaults or None)
+
+    if name not in argspec.args:
+        return argspec
+
+    args = list(argspec.args)
+    defaults = list(argspec.defaults or ())
+
+    ndx = args.index(name)
+    default_ndx = ndx - (len(args) - len(defaults))
+    if default_ndx >= 0:
+        del defaults[default_ndx]
+    del args[ndx]
+
+    return argspec._replace(args=args, defaults=tuple(defaults) or None)
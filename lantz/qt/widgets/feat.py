@@ -140,9 +140,15 @@ class DictFeatWidget(QtGui.QWidget):
     def value_from_feat(self):
         return self._value_widget.value_from_feat()
 
+    def request_value_from_feat(self):
+        return self._value_widget.request_value_from_feat()
+
     def value_to_feat(self):
         return self._value_widget.value_to_feat()
 
+    def request_value_to_feat(self):
+        return self._value_widget.request_value_to_feat()
+
     @property
     def feat(self):
         return self._value_widget.feat
@@ -235,14 +241,14 @@ class LabeledFeatWidget(QtGui.QWidget):
 
     @QtCore.Slot()
     def on_get_clicked(self):
-        self._widget.value_from_feat()
+        self._widget.request_value_from_feat()
 
     @QtCore.Slot()
     def on_set_clicked(self):
         font = QtGui.QFont()
         font.setItalic(False)
         self._widget.setFont(font)
-        self._widget.value_to_feat()
+        self._widget.request_value_to_feat()
 
     @property
     def readable(self):
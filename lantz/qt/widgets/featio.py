@@ -0,0 +1,638 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.widgets.featio
+    ~~~~~~~~~~~~~~~~~~~~
+
+    Read and write feats and run actions in worker threads,
+    so that slow instruments do not block the GUI thread.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import time
+import inspect
+import functools
+import threading
+
+from lantz.core.feat import DictFeat
+
+from ..log import LOGGER
+from ..utils.qt import QtCore, isdeleted
+
+
+def runs_in_worker(target):
+    """True if the feats and actions of target are accessed in a worker thread.
+
+    Only drivers wrapped in a QObject (see wrap_driver_cls) qualify, as their
+    _changed signals are queued to the thread of each receiver. A plain driver
+    calls its _changed callbacks in the thread that reads or writes the feat,
+    which would update every widget connected to it from the worker thread.
+    Such drivers are accessed in the calling thread instead.
+    """
+    return isinstance(target, QtCore.QObject)
+
+
+def _deliver(receiver, callback, *args):
+    """Call callback(*args) in the thread of the reader or runner.
+
+    The call is skipped if receiver (the QObject that requested the
+    operation, if given) was deleted in the meantime. Other errors
+    are logged, so they do not prevent the remaining callbacks.
+    """
+    if receiver is not None and isdeleted(receiver):
+        return
+    try:
+        callback(*args)
+    except Exception:
+        LOGGER.exception('In callback {!r}'.format(callback))
+
+
+class _ReadTask(QtCore.QRunnable):
+    """Read a feat (or a key of a DictFeat) in a worker thread
+    and report the result to the reader.
+    """
+
+    def __init__(self, reader, request, target, feat, key):
+        super().__init__()
+        self.reader = reader
+        self.request = request
+        self.target = target
+        self.feat = feat
+        self.key = key
+
+    def run(self):
+        try:
+            if isinstance(self.feat, DictFeat):
+                value = getattr(self.target, self.feat.name)[self.key]
+            else:
+                value = getattr(self.target, self.feat.name)
+        except Exception as ex:
+            self.reader.read_done.emit(self.request, None, ex)
+        else:
+            self.reader.read_done.emit(self.request, value, None)
+
+
+class _BatchReadTask(QtCore.QRunnable):
+    """Read many feats of a driver in a worker thread
+    and report all results at once to the reader.
+    """
+
+    def __init__(self, reader, callback, receiver, target, items):
+        super().__init__()
+        self.reader = reader
+        self.callback = callback
+        self.receiver = receiver
+        self.target = target
+        self.items = items
+
+    def run(self):
+        values, errors, timings = {}, {}, {}
+        start = time.perf_counter()
+
+        read_many = getattr(self.target, 'read_many', None)
+        if callable(read_many):
+            try:
+                values = read_many([(feat.name, key) for feat, key in self.items])
+            except Exception as ex:
+                errors[None] = ex
+        else:
+            for feat, key in self.items:
+                item_start = time.perf_counter()
+                try:
+                    if isinstance(feat, DictFeat):
+                        values[(feat.name, key)] = getattr(self.target, feat.name)[key]
+                    else:
+                        values[(feat.name, key)] = getattr(self.target, feat.name)
+                except Exception as ex:
+                    errors[(feat.name, key)] = ex
+                timings[(feat.name, key)] = time.perf_counter() - item_start
+
+        self.reader.batch_done.emit(self.callback, self.receiver, values, errors, timings,
+                                    time.perf_counter() - start)
+
+
+class FeatReader(QtCore.QObject):
+    """Reads feats in a thread pool and delivers the values in the
+    thread of the reader (usually the GUI thread).
+
+    Feats of drivers that are not wrapped in a QObject are read in the
+    calling thread (see runs_in_worker). In both cases, the values are
+    delivered from the event loop of the reader thread.
+
+    Requests for a feat (and key) that is already being read are not
+    sent to the instrument again; they get the value of the read in flight.
+
+    Must be used from the thread in which it was created.
+
+    Parameters
+    ----------
+    pool : QThreadPool
+        pool used to run the reads.
+        If None, the global instance is used. (Default value = None)
+    """
+
+    #: Signal emitted (usually from a worker thread) when a read is done.
+    #: Parameters: request, value, exception (or None)
+    read_done = QtCore.Signal(object, object, object)
+
+    #: Signal emitted (usually from a worker thread) when a batch read is done.
+    #: Parameters: callback, receiver, values, errors, timings, elapsed time
+    batch_done = QtCore.Signal(object, object, object, object, object, object)
+
+    def __init__(self, pool=None, parent=None):
+        super().__init__(parent)
+        self._pool = pool or QtCore.QThreadPool.globalInstance()
+
+        #: Dict[(target id, feat name, key), list of (callback, errback, receiver)]
+        self._in_flight = {}
+
+        self.read_done.connect(self._on_read_done, QtCore.Qt.QueuedConnection)
+        self.batch_done.connect(self._on_batch_done, QtCore.Qt.QueuedConnection)
+
+    def read(self, target, feat, key, callback, errback=None, receiver=None):
+        """Request a read.
+
+        Parameters
+        ----------
+        target : Driver
+            the driver.
+        feat : Feat or DictFeat
+            the feat to read.
+        key :
+            the key of a DictFeat or MISSING.
+        callback : callable
+            called in the reader thread as callback(value, key)
+            when the value arrives.
+        errback : callable
+            called in the reader thread as errback(exception, key)
+            if the read fails. (Default value = None)
+        receiver : QObject
+            if given and deleted before the read is done,
+            callback and errback are not called. (Default value = None)
+
+        Returns
+        -------
+        bool
+            True if a new read was started,
+            False if it was merged with a read in flight.
+        """
+        request = (id(target), feat.name, key)
+
+        callbacks = self._in_flight.get(request)
+        if callbacks is not None:
+            callbacks.append((callback, errback, receiver))
+            return False
+
+        self._in_flight[request] = [(callback, errback, receiver)]
+        task = _ReadTask(self, request, target, feat, key)
+        if runs_in_worker(target):
+            self._pool.start(task)
+        else:
+            task.run()
+        return True
+
+    def read_many(self, target, items, callback, receiver=None):
+        """Request a read of many feats of a driver in a single task.
+
+        If the driver has a `read_many` method, it is called once with a list
+        of (feat name, key) tuples (key is MISSING for Feats) and must return
+        a dict mapping these tuples to values. This allows drivers to fetch
+        many values in a single instrument transaction. Otherwise, the feats
+        are read one after the other.
+
+        Parameters
+        ----------
+        target : Driver
+            the driver.
+        items : iterable of (Feat or DictFeat, key)
+            the feats to read (key is MISSING for Feats).
+        callback : callable
+            called in the reader thread when all values arrive as
+            callback(values, errors, timings, elapsed) where values, errors and
+            timings (in seconds) are dicts keyed by (feat name, key). If
+            read_many fails, the exception is stored in errors[None] and no
+            individual timings are recorded.
+        receiver : QObject
+            if given and deleted before the values arrive,
+            callback is not called. (Default value = None)
+        """
+        task = _BatchReadTask(self, callback, receiver, target, list(items))
+        if runs_in_worker(target):
+            self._pool.start(task)
+        else:
+            task.run()
+
+    def in_flight(self):
+        """Number of reads in progress."""
+        return len(self._in_flight)
+
+    def _on_read_done(self, request, value, ex):
+        callbacks = self._in_flight.pop(request, ())
+        key = request[2]
+
+        if ex is not None:
+            LOGGER.error('While reading {}: {}'.format(request[1], ex))
+
+        for callback, errback, receiver in callbacks:
+            if ex is None:
+                _deliver(receiver, callback, value, key)
+            elif errback is not None:
+                _deliver(receiver, errback, ex, key)
+
+    def _on_batch_done(self, callback, receiver, values, errors, timings, elapsed):
+        for item, ex in errors.items():
+            LOGGER.error('While reading {}: {}'.format(item[0] if item else 'many feats', ex))
+
+        _deliver(receiver, callback, values, errors, timings, elapsed)
+
+
+_READER = None
+
+
+def feat_reader():
+    """Return the FeatReader shared by all widgets,
+    creating it (in the current thread) if necessary.
+    """
+    global _READER
+    if _READER is None:
+        _READER = FeatReader()
+    return _READER
+
+
+class _WriteTask(QtCore.QRunnable):
+    """Write a feat (or a key of a DictFeat) in a worker thread
+    and report the result to the writer.
+    """
+
+    def __init__(self, writer, request, target, feat, key, value, enqueued):
+        super().__init__()
+        self.writer = writer
+        self.request = request
+        self.target = target
+        self.feat = feat
+        self.key = key
+        self.value = value
+        self.enqueued = enqueued
+
+    def run(self):
+        try:
+            if isinstance(self.feat, DictFeat):
+                getattr(self.target, self.feat.name)[self.key] = self.value
+            else:
+                setattr(self.target, self.feat.name, self.value)
+        except Exception as ex:
+            self.writer.write_done.emit(self.request, time.perf_counter() - self.enqueued, ex)
+        else:
+            self.writer.write_done.emit(self.request, time.perf_counter() - self.enqueued, None)
+
+
+class FeatWriter(QtCore.QObject):
+    """Writes feats in a thread pool (write-behind).
+
+    Feats of drivers that are not wrapped in a QObject are written in the
+    calling thread (see runs_in_worker).
+
+    For each (target, feat, key) at most one write is in progress.
+    Values requested while a write is in progress (or waiting for the
+    minimum interval) replace each other: only the latest one is written.
+
+    Must be used from the thread in which it was created.
+
+    Parameters
+    ----------
+    pool : QThreadPool
+        pool used to run the writes.
+        If None, the global instance is used. (Default value = None)
+    """
+
+    #: Signal emitted (usually from a worker thread) when a write is done.
+    #: Parameters: request, latency in seconds, exception (or None)
+    write_done = QtCore.Signal(object, object, object)
+
+    def __init__(self, pool=None, parent=None):
+        super().__init__(parent)
+        self._pool = pool or QtCore.QThreadPool.globalInstance()
+
+        #: Dict[request, (target, feat, key, value, enqueued time, min_interval)]
+        #: Writes waiting to be started.
+        self._pending = {}
+
+        #: Requests being written or waiting for the minimum interval.
+        self._busy = set()
+
+        #: Dict[request, perf_counter] start of the last write.
+        self._last_start = {}
+
+        #: Number of completed writes.
+        self.writes = 0
+
+        #: Number of values replaced by a newer one before being written.
+        self.collapsed = 0
+
+        #: Number of writes that raised an exception.
+        self.errors = 0
+
+        #: Latency (from request to completion) in seconds.
+        self.last_latency = 0.
+        self.max_latency = 0.
+        self._total_latency = 0.
+
+        self.write_done.connect(self._on_write_done, QtCore.Qt.QueuedConnection)
+
+    def write(self, target, feat, key, value, min_interval=0.):
+        """Request a write.
+
+        Parameters
+        ----------
+        target : Driver
+            the driver.
+        feat : Feat or DictFeat
+            the feat to write.
+        key :
+            the key of a DictFeat or MISSING.
+        value :
+            the value to write.
+        min_interval : float
+            minimum time in seconds between the start of consecutive
+            writes to the same feat (and key). (Default value = 0.)
+        """
+        request = (id(target), feat.name, key)
+
+        if request in self._pending:
+            self.collapsed += 1
+
+        self._pending[request] = (target, feat, key, value, time.perf_counter(), min_interval)
+
+        if request not in self._busy:
+            self._submit(request)
+
+    def _submit(self, request):
+        min_interval = self._pending[request][-1]
+        last_start = self._last_start.get(request)
+
+        if min_interval and last_start is not None:
+            delay = last_start + min_interval - time.perf_counter()
+            if delay > 0:
+                self._busy.add(request)
+                QtCore.QTimer.singleShot(int(delay * 1000), lambda: self._start(request))
+                return
+
+        self._start(request)
+
+    def _start(self, request):
+        item = self._pending.pop(request, None)
+        if item is None:
+            self._busy.discard(request)
+            return
+
+        target, feat, key, value, enqueued, _ = item
+        self._busy.add(request)
+        self._last_start[request] = time.perf_counter()
+        task = _WriteTask(self, request, target, feat, key, value, enqueued)
+        if runs_in_worker(target):
+            self._pool.start(task)
+        else:
+            task.run()
+
+    def _on_write_done(self, request, latency, ex):
+        self._busy.discard(request)
+
+        self.writes += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+
+        if ex is not None:
+            self.errors += 1
+            LOGGER.error('While writing {}: {}'.format(request[1], ex))
+
+        if request in self._pending:
+            self._submit(request)
+
+    def queue_depth(self):
+        """Number of writes waiting to be started."""
+        return len(self._pending)
+
+    def stats(self):
+        """Diagnostic information as a dict.
+
+        - writes, collapsed, errors: counters.
+        - queue_depth: writes waiting to be started.
+        - in_progress: writes being done or waiting for the minimum interval.
+        - last_latency, mean_latency, max_latency: in seconds.
+        """
+        return {'writes': self.writes,
+                'collapsed': self.collapsed,
+                'errors': self.errors,
+                'queue_depth': len(self._pending),
+                'in_progress': len(self._busy),
+                'last_latency': self.last_latency,
+                'mean_latency': self._total_latency / self.writes if self.writes else 0.,
+                'max_latency': self.max_latency}
+
+
+_WRITER = None
+
+
+def feat_writer():
+    """Return the FeatWriter shared by all widgets,
+    creating it (in the current thread) if necessary.
+    """
+    global _WRITER
+    if _WRITER is None:
+        _WRITER = FeatWriter()
+    return _WRITER
+
+
+#: Name of the keyword argument used to pass a threading.Event
+#: to actions that can be cancelled. Such actions should check
+#: the event periodically and return early when it is set.
+CANCEL_ARGUMENT = 'cancel_event'
+
+
+def accepts_cancel(func):
+    """True if func has an argument named as CANCEL_ARGUMENT.
+    """
+    wrapped = getattr(func, '__wrapped__', func)
+    try:
+        return CANCEL_ARGUMENT in inspect.signature(wrapped).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _action_target(func):
+    """Return the driver of an action (or bound method), or None.
+    """
+    target = getattr(func, '__self__', None)
+    if target is None and isinstance(func, functools.partial) and func.args:
+        # Lantz actions are bound with functools.partial.
+        target = func.args[0]
+    return target
+
+
+class ActionHandle(object):
+    """Handle to an action running in a worker thread.
+
+    Parameters
+    ----------
+    name : str
+        name of the action.
+    cancellable : bool
+        True if the action accepts a cancel event.
+    """
+
+    def __init__(self, name, cancellable):
+        self.name = name
+        self.cancellable = cancellable
+
+        #: Event passed to the action (as CANCEL_ARGUMENT) if cancellable.
+        self.cancel_event = threading.Event()
+
+        #: perf_counter when the action was submitted.
+        self.start = time.perf_counter()
+
+        #: Elapsed time in seconds once the action is done, None before.
+        self.duration = None
+
+    @property
+    def done(self):
+        return self.duration is not None
+
+    @property
+    def elapsed(self):
+        """Seconds since the action was submitted (or its duration, if done)."""
+        if self.duration is not None:
+            return self.duration
+        return time.perf_counter() - self.start
+
+    def cancel(self):
+        """Request the action to stop.
+
+        Only has an effect on actions that accept a cancel event.
+        """
+        self.cancel_event.set()
+
+
+class _ActionTask(QtCore.QRunnable):
+    """Run an action in a worker thread and report the result to the runner.
+    """
+
+    def __init__(self, runner, handle, func, arguments, callback, receiver):
+        super().__init__()
+        self.runner = runner
+        self.handle = handle
+        self.func = func
+        self.arguments = arguments
+        self.callback = callback
+        self.receiver = receiver
+
+    def run(self):
+        try:
+            result = self.func(**self.arguments)
+        except Exception as ex:
+            self.runner._done.emit(self.handle, self.callback, self.receiver, None, ex,
+                                   time.perf_counter() - self.handle.start)
+        else:
+            self.runner._done.emit(self.handle, self.callback, self.receiver, result, None,
+                                   time.perf_counter() - self.handle.start)
+
+
+class ActionRunner(QtCore.QObject):
+    """Runs driver actions in a thread pool and delivers the results
+    in the thread of the runner (usually the GUI thread).
+
+    Actions of drivers that are not wrapped in a QObject are run in the
+    calling thread (see runs_in_worker). In both cases, the results are
+    delivered from the event loop of the runner thread.
+
+    Must be used from the thread in which it was created.
+
+    Parameters
+    ----------
+    pool : QThreadPool
+        pool used to run the actions.
+        If None, the global instance is used. (Default value = None)
+    """
+
+    #: Signal emitted when an action is submitted.
+    #: Parameters: handle
+    action_started = QtCore.Signal(object)
+
+    #: Signal emitted when an action is done.
+    #: Parameters: handle, result, exception (or None), elapsed time in seconds
+    action_done = QtCore.Signal(object, object, object, object)
+
+    # Emitted from the thread running the action.
+    _done = QtCore.Signal(object, object, object, object, object, object)
+
+    def __init__(self, pool=None, parent=None):
+        super().__init__(parent)
+        self._pool = pool or QtCore.QThreadPool.globalInstance()
+
+        #: Handles of the actions in progress.
+        self.running = set()
+
+        self._done.connect(self._on_done, QtCore.Qt.QueuedConnection)
+
+    def run(self, func, arguments=None, callback=None, receiver=None):
+        """Run an action in a worker thread
+        (or in the calling thread, see runs_in_worker).
+
+        Parameters
+        ----------
+        func : callable
+            the (bound) action.
+        arguments : dict
+            keyword arguments for the action. (Default value = None)
+        callback : callable
+            called in the runner thread when the action is done as
+            callback(handle, result, exception, elapsed). (Default value = None)
+        receiver : QObject
+            if given and deleted before the action is done,
+            callback is not called. (Default value = None)
+
+        Returns
+        -------
+        ActionHandle
+        """
+        wrapped = getattr(func, '__wrapped__', func)
+        arguments = dict(arguments or {})
+
+        handle = ActionHandle(getattr(wrapped, '__name__', str(func)), accepts_cancel(func))
+        if handle.cancellable:
+            arguments[CANCEL_ARGUMENT] = handle.cancel_event
+
+        self.running.add(handle)
+        self.action_started.emit(handle)
+        task = _ActionTask(self, handle, func, arguments, callback, receiver)
+        if runs_in_worker(_action_target(func)):
+            self._pool.start(task)
+        else:
+            task.run()
+        return handle
+
+    def _on_done(self, handle, callback, receiver, result, ex, elapsed):
+        handle.duration = elapsed
+        self.running.discard(handle)
+
+        if ex is not None:
+            LOGGER.error('While running {}: {}'.format(handle.name, ex))
+
+        if callback is not None:
+            _deliver(receiver, callback, handle, result, ex, elapsed)
+
+        self.action_done.emit(handle, result, ex, elapsed)
+
+
+_RUNNER = None
+
+
+def action_runner():
+    """Return the ActionRunner shared by all widgets,
+    creating it (in the current thread) if necessary.
+    """
+    global _RUNNER
+    if _RUNNER is None:
+        _RUNNER = ActionRunner()
+    return _RUNNER
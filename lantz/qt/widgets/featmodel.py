@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.widgets.featmodel
+    ~~~~~~~~~~~~~~~~~~~~~~~
+
+    Qt item model exposing the feats of a driver and a delegate that
+    creates value widgets only while a row is being edited.
+
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import weakref
+import functools
+
+from lantz.core.helpers import MISSING
+
+from ..log import LOGGER
+from ..utils.qt import QtCore, QtGui, isdeleted
+from .common import WidgetMixin
+from .featio import feat_reader, feat_writer
+
+
+def _unwrap(feat):
+    return getattr(feat, 'proxied', feat)
+
+
+def _disconnect_all(connections, *args):
+    for signal, slot in connections:
+        try:
+            signal.disconnect(slot)
+        except Exception:
+            pass
+    del connections[:]
+
+
+class FeatTableModel(QtCore.QAbstractTableModel):
+    """Table model with a row for each Feat and each key of each DictFeat
+    of a driver, and two columns: name and value.
+
+    Values are read the first time a row is shown, so only the visible
+    rows of a large driver are queried. Editing a value writes it to the
+    driver. Reads and writes are done in a worker thread if the driver is
+    wrapped in a QObject (see runs_in_worker), and in the calling thread
+    otherwise.
+
+    DictFeats without a list of keys cannot be enumerated and are skipped.
+
+    Parameters
+    ----------
+    target : Driver
+        driver object to map.
+    parent : QObject
+        parent object. (Default value = None)
+    """
+
+    NAME_COLUMN = 0
+    VALUE_COLUMN = 1
+
+    # The driver _changed signals are forwarded through this signal, which
+    # is always queued: rows are not updated while the view asks for data.
+    # Parameters: feat name, value, key
+    _feat_changed = QtCore.Signal(object, object, object)
+
+    def __init__(self, target, parent=None):
+        super().__init__(parent)
+        self._lantz_target = target
+
+        #: List[(feat, key, label)]
+        self._rows = []
+
+        #: Dict[(feat name, key), row]
+        self._row_by_item = {}
+
+        #: Dict[row, value] last known value of each row.
+        self._values = {}
+
+        #: Rows with a read in progress or done.
+        self._requested = set()
+
+        #: Dict[row, exception] rows whose last read failed.
+        self._errors = {}
+
+        for feat_name, feat in sorted(target.feats.items()):
+            self._add_row(_unwrap(feat), MISSING, feat_name)
+
+        for feat_name, feat in sorted(target.dictfeats.items()):
+            feat = _unwrap(feat)
+            if not feat.keys:
+                LOGGER.debug('Cannot list keys of {}, skipping.'.format(feat_name))
+                continue
+            for key in feat.keys:
+                self._add_row(feat, key, '{}[{}]'.format(feat_name, key))
+
+        self._feat_changed.connect(self._on_feat_changed, QtCore.Qt.QueuedConnection)
+
+        #: List[(signal, slot)] connections to the driver.
+        self._connections = []
+        for feat_name in list(target.feats.keys()) + list(target.dictfeats.keys()):
+            signal = getattr(target, feat_name + '_changed')
+            slot = self._make_slot(feat_name)
+            signal.connect(slot)
+            self._connections.append((signal, slot))
+
+        # The list (not the model) is bound, so it can be used after the model is gone.
+        self.destroyed.connect(functools.partial(_disconnect_all, self._connections))
+
+    def _add_row(self, feat, key, label):
+        self._row_by_item[(feat.name, key)] = len(self._rows)
+        self._rows.append((feat, key, label))
+
+    def _make_slot(self, feat_name):
+        # The driver must not keep the model alive.
+        ref = weakref.ref(self)
+
+        def _on_changed(value, old_value=None, key=MISSING):
+            model = ref()
+            if model is None or isdeleted(model):
+                return
+            model._feat_changed.emit(feat_name, value, key)
+
+        return _on_changed
+
+    def _on_feat_changed(self, feat_name, value, key):
+        row = self._row_by_item.get((feat_name, key))
+        if row is not None:
+            self._set_row_value(row, value)
+
+    def disconnect_target(self):
+        """Stop following the changes of the driver feats."""
+        _disconnect_all(self._connections)
+
+    @property
+    def lantz_target(self):
+        """Driver mapped by this model."""
+        return self._lantz_target
+
+    def feat_at(self, row):
+        """Return feat and key (MISSING for Feats) of a row."""
+        feat, key, _ = self._rows[row]
+        return feat, key
+
+    def readable(self, row):
+        return self._rows[row][0].fget not in (None, MISSING)
+
+    def writable(self, row):
+        return self._rows[row][0].fset is not None
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return 2
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return ('Name', 'Value')[section]
+        return None
+
+    def flags(self, index):
+        flags = QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+        if index.column() == self.VALUE_COLUMN and self.writable(index.row()):
+            flags |= QtCore.Qt.ItemIsEditable
+        return flags
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = index.row()
+
+        if index.column() == self.NAME_COLUMN:
+            if role == QtCore.Qt.DisplayRole:
+                return self._rows[row][2]
+            return None
+
+        if role == QtCore.Qt.DisplayRole:
+            if row in self._values:
+                return str(self._values[row])
+            if row in self._errors:
+                return 'error'
+            # Views only ask for the data of visible rows,
+            # so this reads the values lazily.
+            self.request_row(row)
+            return ''
+
+        if role == QtCore.Qt.EditRole:
+            return self._values.get(row)
+
+        if row in self._errors:
+            if role == QtCore.Qt.ToolTipRole:
+                return 'Could not read: {}'.format(self._errors[row])
+            if role == QtCore.Qt.ForegroundRole:
+                return QtGui.QBrush(QtCore.Qt.red)
+
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        if role != QtCore.Qt.EditRole or index.column() != self.VALUE_COLUMN:
+            return False
+
+        row = index.row()
+        feat, key, _ = self._rows[row]
+        feat_writer().write(self._lantz_target, feat, key, value)
+        self._set_row_value(row, value)
+        return True
+
+    def _set_row_value(self, row, value):
+        self._values[row] = value
+        self._errors.pop(row, None)
+        index = self.index(row, self.VALUE_COLUMN)
+        self.dataChanged.emit(index, index)
+
+    def request_row(self, row):
+        """Read the value of a row (if not done before).
+
+        If the read fails, the error is shown in the row (and it is not
+        read again until the next refresh).
+        """
+        if row in self._requested or not self.readable(row):
+            return
+        self._requested.add(row)
+
+        feat, key, _ = self._rows[row]
+        feat_reader().read(self._lantz_target, feat, key,
+                           lambda value, _key: self._set_row_value(row, value),
+                           lambda ex, _key: self._set_row_error(row, ex),
+                           receiver=self)
+
+    def _set_row_error(self, row, ex):
+        self._values.pop(row, None)
+        self._errors[row] = ex
+        index = self.index(row, self.VALUE_COLUMN)
+        self.dataChanged.emit(index, index)
+
+    def refresh(self, callback=None):
+        """Read all readable rows in a single task
+        (see :meth:`FeatReader.read_many`).
+
+        Parameters
+        ----------
+        callback : callable
+            called as callback(values, errors, timings, elapsed)
+            after the model is updated. (Default value = None)
+        """
+        rows = [row for row in range(len(self._rows)) if self.readable(row)]
+        self._requested.update(rows)
+        feat_reader().read_many(self._lantz_target, [self.feat_at(row) for row in rows],
+                                lambda *args: self._on_refresh_done(callback, *args),
+                                receiver=self)
+
+    def _on_refresh_done(self, callback, values, errors, timings, elapsed):
+        for item, value in values.items():
+            row = self._row_by_item.get(item)
+            if row is not None:
+                self._values[row] = value
+                self._errors.pop(row, None)
+
+        for item, ex in errors.items():
+            rows = range(len(self._rows)) if item is None else [self._row_by_item.get(item)]
+            for row in rows:
+                if row is not None and row not in self._values:
+                    self._errors[row] = ex
+
+        # A single notification for the whole column.
+        if self._rows:
+            self.dataChanged.emit(self.index(0, self.VALUE_COLUMN),
+                                  self.index(len(self._rows) - 1, self.VALUE_COLUMN))
+
+        if callback is not None:
+            callback(values, errors, timings, elapsed)
+
+
+class FeatItemDelegate(QtGui.QStyledItemDelegate):
+    """Delegate creating the same widgets used by :class:`LabeledFeatWidget`
+    as editors of a :class:`FeatTableModel`.
+
+    Editors exist only while a value is being edited.
+    """
+
+    def createEditor(self, parent, option, index):
+        feat, _ = index.model().feat_at(index.row())
+        editor = WidgetMixin.from_feat(feat, parent)
+        editor.bind_feat(feat)
+        return editor
+
+    def setEditorData(self, editor, index):
+        value = index.data(QtCore.Qt.EditRole)
+        if value is not None:
+            editor.setValue(value)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.value(), QtCore.Qt.EditRole)
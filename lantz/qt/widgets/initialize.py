@@ -1,6 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+    lantz.widgets.initialize
+    ~~~~~~~~~~~~~~~~~~~~~~~~
 
+    Widgets to initialize drivers and to show the initialization timeline.
 
-from ..utils.qt import QtGui
+    :copyright: 2018 by Lantz Authors, see AUTHORS for more details.
+    :license: BSD, see LICENSE for more details.
+"""
+
+import csv
+import json
+import time
+import threading
+
+from ..utils.qt import QtCore, QtGui
+
+
+class InitTimeline(object):
+    """Start and end time of the initialization of each driver.
+
+    Methods can be called from any thread.
+
+    Times are measured with time.perf_counter, relative to the
+    creation of the timeline. When drivers are initialized concurrently,
+    a group of drivers is reported as initializing when the group is
+    submitted, so the start time includes the wait for a free worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+        #: Dict[str, dict] with keys: name, class, start, end, error.
+        #: Ordered by start.
+        self._entries = {}
+
+        #: End time of the whole initialization or None.
+        self.finished = None
+
+    def now(self):
+        """Seconds since the timeline was created."""
+        return time.perf_counter() - self._origin
+
+    def started(self, driver):
+        with self._lock:
+            self._entries[driver.name] = {'name': driver.name,
+                                          'class': driver.__class__.__name__,
+                                          'start': self.now(),
+                                          'end': None,
+                                          'error': None}
+
+    def stopped(self, driver, error=None):
+        with self._lock:
+            entry = self._entries[driver.name]
+            entry['end'] = self.now()
+            if error is not None:
+                entry['error'] = str(error)
+
+    def finish(self):
+        self.finished = self.now()
+
+    def entries(self):
+        """Return a list of dicts (name, class, start, end, error, duration),
+        ordered by start time. end and duration are None while running.
+        """
+        with self._lock:
+            entries = [dict(entry) for entry in self._entries.values()]
+
+        for entry in entries:
+            entry['duration'] = None if entry['end'] is None else entry['end'] - entry['start']
+        return entries
+
+    def critical_path(self):
+        """Return the names of the drivers in the chain that determined
+        the total initialization time.
+
+        Starting at the driver that finished last, the previous element of
+        the chain is the driver that finished last before (or when) the
+        current one started, i.e. the one it was waiting for.
+        """
+        done = [entry for entry in self.entries() if entry['end'] is not None]
+        if not done:
+            return []
+
+        # Callbacks are not exactly simultaneous.
+        tolerance = 1e-3
+
+        current = max(done, key=lambda entry: entry['end'])
+        path = [current['name']]
+        while True:
+            before = [entry for entry in done
+                      if entry['end'] <= current['start'] + tolerance and entry['name'] not in path]
+            if not before:
+                break
+            current = max(before, key=lambda entry: entry['end'])
+            path.append(current['name'])
+
+        return path[::-1]
+
+    def to_dict(self):
+        """Return the timeline as a JSON serializable dict.
+        """
+        return {'drivers': self.entries(),
+                'critical_path': self.critical_path(),
+                'total': self.finished}
+
+    def save(self, filename):
+        """Save the timeline to a file, as CSV if the name ends with .csv
+        and as JSON otherwise.
+        """
+        if filename.endswith('.csv'):
+            fields = ('name', 'class', 'start', 'end', 'duration', 'error')
+            critical = set(self.critical_path())
+            with open(filename, 'w', newline='') as fo:
+                writer = csv.writer(fo)
+                writer.writerow(fields + ('critical', ))
+                for entry in self.entries():
+                    writer.writerow([entry[field] for field in fields] + [entry['name'] in critical])
+        else:
+            with open(filename, 'w') as fo:
+                json.dump(self.to_dict(), fo, indent=2)
+
+
+class InitGanttWidget(QtGui.QWidget):
+    """Shows an InitTimeline as a Gantt chart, one bar per driver.
+
+    Drivers in the critical path are drawn in red, failed drivers in gray
+    and running drivers are extended up to the current time.
+    The chart is updated periodically while the initialization runs.
+    """
+
+    ROW_HEIGHT = 18
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._timeline = None
+        self._critical = set()
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(100)
+        self._timer.timeout.connect(self._refresh)
+
+        self.setMinimumHeight(3 * self.ROW_HEIGHT)
+
+    @property
+    def timeline(self):
+        return self._timeline
+
+    def set_timeline(self, timeline):
+        self._timeline = timeline
+        self._critical = set()
+        self._timer.start()
+        self._refresh()
+
+    def on_finished(self, *args):
+        """Stop updating and compute the critical path."""
+        self._timer.stop()
+        if self._timeline is not None:
+            self._critical = set(self._timeline.critical_path())
+        self._refresh()
+
+    def _refresh(self):
+        if self._timeline is not None:
+            rows = len(self._timeline.entries()) + 1
+            self.setMinimumHeight(max(rows, 3) * self.ROW_HEIGHT)
+        self.update()
+
+    def paintEvent(self, event):
+        if self._timeline is None:
+            return
+
+        entries = self._timeline.entries()
+        if not entries:
+            return
+
+        now = self._timeline.finished or self._timeline.now()
+        total = max(now, 1e-6)
+
+        painter = QtGui.QPainter(self)
+        metrics = painter.fontMetrics()
+        label_width = max(metrics.width(entry['name']) for entry in entries) + 10
+        width = max(self.width() - label_width - 60, 10)
+        height = self.ROW_HEIGHT
+
+        for ndx, entry in enumerate(entries):
+            y = ndx * height
+            end = entry['end'] if entry['end'] is not None else now
+            x0 = label_width + int(entry['start'] / total * width)
+            x1 = label_width + max(int(end / total * width), x0 - label_width + 1)
+
+            if entry['error']:
+                color = QtGui.QColor('gray')
+            elif entry['name'] in self._critical:
+                color = QtGui.QColor(220, 60, 60)
+            elif entry['end'] is None:
+                color = QtGui.QColor(240, 200, 80)
+            else:
+                color = QtGui.QColor(80, 140, 220)
+
+            painter.drawText(0, y, label_width, height, QtCore.Qt.AlignVCenter, entry['name'])
+            painter.fillRect(x0, y + 3, x1 - x0, height - 6, color)
+            painter.drawText(x1 + 4, y, 60, height, QtCore.Qt.AlignVCenter,
+                             '{:.1f} s'.format(end - entry['start']))
+
+        painter.drawText(label_width, len(entries) * height, width, height,
+                         QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter, '{:.1f} s'.format(now))
+        painter.end()
 
 
 class InitializeWindow(QtGui.QWidget):
@@ -28,6 +234,14 @@ class InitializeWindow(QtGui.QWidget):
         self.thread, self.helper = connect_initialize(self.widget, self.drivers,
                                                       dependencies=self.dependencies,
                                                       concurrent=True)
+        self.gantt.set_timeline(self.helper.timeline)
+        self.helper.finished.connect(self.gantt.on_finished)
+
+    @property
+    def timeline(self):
+        """InitTimeline of the last initialization or None."""
+        helper = getattr(self, 'helper', None)
+        return helper.timeline if helper is not None else None
 
     def createGUI(self):
 
@@ -42,9 +256,12 @@ class InitializeWindow(QtGui.QWidget):
         button.setEnabled(True)
         button.clicked.connect(self.initialize)
 
+        self.gantt = InitGanttWidget()
+
         layout = QtGui.QVBoxLayout()
         layout.addWidget(button)
         layout.addWidget(self.widget)
+        layout.addWidget(self.gantt)
         self.setLayout(layout)
 
         self.setWindowTitle("Driver initialization")
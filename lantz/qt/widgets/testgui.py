@@ -21,14 +21,121 @@ from lantz.core import Driver
 
 from ..utils.qt import QtCore, QtGui
 
+from lantz.core.feat import DictFeat
+
 from ..log import LOGGER
 from ..config import PRINT_TRACEBACK
 from ..utils.qt import QtGui
 from .feat import LabeledFeatWidget
+from .featio import feat_reader, action_runner
+from .featmodel import FeatTableModel, FeatItemDelegate
 from .dialog_action import ArgumentsInputDialog
 
 
-class DriverTestWidget(QtGui.QWidget):
+class _ActionsMixin(object):
+    """Adds a combo box to choose and run the actions of the driver.
+    """
+
+    def _add_actions(self, layout, target):
+        line = QtGui.QFrame(self)
+        #self.line.setGeometry(QtCore.QRect(110, 80, 351, 31))
+        line.setFrameShape(QtGui.QFrame.HLine)
+        line.setFrameShadow(QtGui.QFrame.Sunken)
+        layout.addWidget(line)
+
+        actions_label = QtGui.QLabel(self)
+        actions_label.setText('Actions:')
+        actions_label.setFixedWidth(120)
+
+        self.actions_combo = QtGui.QComboBox(self)
+        actions = [n for n in target.actions.keys() if n not in set(Driver._lantz_actions.keys())]
+        self.actions_combo.addItems(actions)
+
+        self.actions_button = actions_button = QtGui.QPushButton(self)
+        actions_button.setFixedWidth(60)
+        actions_button.setText('Run')
+        actions_button.clicked.connect(self.on_run_clicked)
+
+        self.cancel_button = cancel_button = QtGui.QPushButton(self)
+        cancel_button.setFixedWidth(60)
+        cancel_button.setText('Cancel')
+        cancel_button.setEnabled(False)
+        cancel_button.clicked.connect(self.on_cancel_clicked)
+
+        self.busy_bar = QtGui.QProgressBar(self)
+        self.busy_bar.setRange(0, 0)
+        self.busy_bar.setFixedWidth(60)
+        self.busy_bar.setTextVisible(False)
+        self.busy_bar.hide()
+
+        alayout = QtGui.QHBoxLayout()
+        alayout.addWidget(actions_label)
+        alayout.addWidget(self.actions_combo)
+        alayout.addWidget(actions_button)
+        alayout.addWidget(cancel_button)
+        alayout.addWidget(self.busy_bar)
+
+        layout.addLayout(alayout)
+
+        self.statusBar = QtGui.QLabel()
+        self.statusBar.setText('Ready ...')
+        layout.addWidget(self.statusBar)
+
+        #: ActionHandle of the running action or None.
+        self.running_action = None
+
+        # Updates the elapsed time while an action runs.
+        self._action_timer = QtCore.QTimer(self)
+        self._action_timer.setInterval(200)
+        self._action_timer.timeout.connect(self._show_action_progress)
+
+    @QtCore.Slot()
+    def on_run_clicked(self):
+        func = getattr(self._lantz_target, self.actions_combo.currentText())
+        args = ArgumentsInputDialog.get_params(func, self)
+        if args is None:
+            return
+
+        self.running_action = action_runner().run(func, args, self._on_action_done, receiver=self)
+
+        self.actions_button.setEnabled(False)
+        self.cancel_button.setEnabled(self.running_action.cancellable)
+        self.busy_bar.show()
+        self._show_action_progress()
+        self._action_timer.start()
+
+    @QtCore.Slot()
+    def on_cancel_clicked(self):
+        if self.running_action is not None:
+            self.running_action.cancel()
+            self.cancel_button.setEnabled(False)
+            self.statusBar.setText('Cancelling {} ...'.format(self.running_action.name))
+
+    def _show_action_progress(self):
+        if self.running_action is None or self.running_action.cancel_event.is_set():
+            return
+        self.statusBar.setText('Running {} ... {:.1f} s'.format(self.running_action.name,
+                                                               self.running_action.elapsed))
+
+    def _on_action_done(self, handle, result, ex, elapsed):
+        if handle is not self.running_action:
+            return
+
+        self.running_action = None
+        self._action_timer.stop()
+        self.busy_bar.hide()
+        self.cancel_button.setEnabled(False)
+        self.actions_button.setEnabled(True)
+
+        if ex is not None:
+            out = 'Error: %s' % ex
+        else:
+            out = 'Return value: %s' % result
+
+        self.statusBar.setText('{} ({:.2f} s)'.format(out, elapsed))
+
+
+class DriverTestWidget(_ActionsMixin, QtGui.QWidget):
     """Widget that is automatically filled to control all Feats of a given driver.
 
     Parameters
@@ -38,6 +145,10 @@ class DriverTestWidget(QtGui.QWidget):
     target : Lantz
         driver object to map.
 
+    Refresh reads all readable feats in a single task (see
+    :meth:`FeatReader.read_many`) and updates the widgets at once. The task
+    runs in a worker thread only for drivers wrapped in a QObject
+    (see :func:`runs_in_worker`).
     """
 
     def __init__(self, parent, target):
@@ -50,9 +161,9 @@ class DriverTestWidget(QtGui.QWidget):
         label.setText('%s (%s)' % (target.name, target.__class__.__qualname__))
         layout.addWidget(label)
 
-        recall = QtGui.QPushButton()
+        self.refresh_button = recall = QtGui.QPushButton()
         recall.setText('Refresh')
-        recall.clicked.connect(lambda x: target.refresh())
+        recall.clicked.connect(lambda x: self.refresh())
 
         update = QtGui.QPushButton()
         update.setText('Update')
@@ -73,6 +184,10 @@ class DriverTestWidget(QtGui.QWidget):
         self.writable_widgets = []
         self.widgets = []
 
+        #: Dict[(feat name, key), float] time in seconds to read each feat
+        #: in the last refresh.
+        self.refresh_timings = {}
+
         # Feat
         for feat_name, feat in sorted(target.feats.items()):
             try:
@@ -106,48 +221,70 @@ class DriverTestWidget(QtGui.QWidget):
                     traceback.print_exc()
 
         # Actions
-        line = QtGui.QFrame(self)
-        #self.line.setGeometry(QtCore.QRect(110, 80, 351, 31))
-        line.setFrameShape(QtGui.QFrame.HLine)
-        line.setFrameShadow(QtGui.QFrame.Sunken)
-        layout.addWidget(line)
+        self._add_actions(layout, target)
 
-        actions_label = QtGui.QLabel(self)
-        actions_label.setText('Actions:')
-        actions_label.setFixedWidth(120)
+    def _value_widgets(self):
+        """Yield the value widget (WidgetMixin) of each readable feat.
+        """
+        for widget in self.widgets:
+            if not widget.readable:
+                continue
+            if isinstance(widget.feat, DictFeat):
+                yield widget._widget._value_widget
+            else:
+                yield widget._widget
+
+    def refresh(self):
+        """Read all readable feats (in a worker thread if the driver
+        is wrapped in a QObject) and update the widgets when all values arrive.
+        """
+        if self._lantz_target is None:
+            return
 
-        self.actions_combo = QtGui.QComboBox(self)
-        actions = [n for n in target.actions.keys() if n not in set(Driver._lantz_actions.keys())]
-        self.actions_combo.addItems(actions)
+        widgets = {}
+        for widget in self._value_widgets():
+            widgets[(widget.feat.name, widget.feat_key)] = widget
 
-        actions_button = QtGui.QPushButton(self)
-        actions_button.setFixedWidth(60)
-        actions_button.setText('Run')
-        actions_button.clicked.connect(self.on_run_clicked)
+        if not widgets:
+            return
 
-        alayout = QtGui.QHBoxLayout()
-        alayout.addWidget(actions_label)
-        alayout.addWidget(self.actions_combo)
-        alayout.addWidget(actions_button)
+        self.refresh_button.setEnabled(False)
+        self.statusBar.setText('Refreshing {} feats ...'.format(len(widgets)))
 
-        layout.addLayout(alayout)
+        for widget in widgets.values():
+            widget._batch_reads += 1
 
-        self.statusBar = QtGui.QLabel()
-        self.statusBar.setText('Ready ...')
-        layout.addWidget(self.statusBar)
+        target = self._lantz_target
+        feat_reader().read_many(target,
+                                [(widget._feat, key) for (_, key), widget in widgets.items()],
+                                lambda *args: self._on_refresh_done(target, widgets, *args),
+                                receiver=self)
 
-    @QtCore.Slot()
-    def on_run_clicked(self):
-        func = getattr(self._lantz_target, self.actions_combo.currentText())
-        args = ArgumentsInputDialog.get_params(func, self)
-        self.statusBar.setText('Running ...')
-        try:
-            out = func(**args)
-            out = 'Return value: %s' % out
-        except Exception as e:
-            out = 'Error: %s' % e
+    def _on_refresh_done(self, target, widgets, values, errors, timings, elapsed):
+        self.refresh_button.setEnabled(True)
 
-        self.statusBar.setText(out)
+        for widget in widgets.values():
+            widget._batch_reads -= 1
+
+        if target is not self._lantz_target:
+            return
+
+        self.refresh_timings = timings
+
+        # Update all widgets in a single pass, repainting once.
+        self.setUpdatesEnabled(False)
+        try:
+            for item, value in values.items():
+                widget = widgets.get(item)
+                if widget is not None:
+                    widget._on_feat_read(value, item[1])
+        finally:
+            self.setUpdatesEnabled(True)
+
+        msg = 'Refreshed {} feats in {:.1f} ms'.format(len(values), elapsed * 1000)
+        if errors:
+            msg += ' ({} errors)'.format(len(errors))
+        self.statusBar.setText(msg)
 
     def update_on_change(self, new_state):
         """Set the 'update_on_change' flag to new_state in each writable widget
@@ -173,26 +310,130 @@ class DriverTestWidget(QtGui.QWidget):
             widget.lantz_target = driver
 
 
+class DriverTestTableWidget(_ActionsMixin, QtGui.QWidget):
+    """Lightweight version of :class:`DriverTestWidget` for drivers with
+    many feats, based on a :class:`FeatTableModel`.
+
+    Values are read when their rows become visible and editor widgets
+    are only created while a value is being edited.
+
+    Parameters
+    ----------
+    parent : PyQt Widget
+        parent widget.
+    target : Lantz
+        driver object to map.
+    """
+
+    def __init__(self, parent, target):
+        super().__init__(parent)
+        self._lantz_target = target
+
+        layout = QtGui.QVBoxLayout(self)
+
+        label = QtGui.QLabel()
+        label.setText('%s (%s)' % (target.name, target.__class__.__qualname__))
+        layout.addWidget(label)
+
+        self.refresh_button = QtGui.QPushButton()
+        self.refresh_button.setText('Refresh')
+        self.refresh_button.clicked.connect(lambda x: self.refresh())
+        layout.addWidget(self.refresh_button)
+
+        #: Dict[(feat name, key), float] time in seconds to read each feat
+        #: in the last refresh.
+        self.refresh_timings = {}
+
+        self.model = FeatTableModel(target, self)
+
+        self.view = QtGui.QTableView(self)
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(FeatItemDelegate(self.view))
+        self.view.verticalHeader().hide()
+        self.view.horizontalHeader().setStretchLastSection(True)
+        self.view.setEditTriggers(QtGui.QAbstractItemView.DoubleClicked |
+                                  QtGui.QAbstractItemView.EditKeyPressed)
+        layout.addWidget(self.view)
+
+        self._add_actions(layout, target)
+
+    def refresh(self):
+        """Read all readable feats in a worker thread
+        and update the table when all values arrive.
+        """
+        self.refresh_button.setEnabled(False)
+        self.statusBar.setText('Refreshing ...')
+        self.model.refresh(self._on_refresh_done)
+
+    def _on_refresh_done(self, values, errors, timings, elapsed):
+        self.refresh_button.setEnabled(True)
+        self.refresh_timings = timings
+
+        msg = 'Refreshed {} feats in {:.1f} ms'.format(len(values), elapsed * 1000)
+        if errors:
+            msg += ' ({} errors)'.format(len(errors))
+        self.statusBar.setText(msg)
+
+    @property
+    def lantz_target(self):
+        """Driver connected to this widget."""
+        return self._lantz_target
+
+
 class SetupTestWidget(QtGui.QWidget):
     """Widget to control multiple drivers.
 
+    The page of each driver is built the first time its tab is shown.
+
     Parameters
     ----------
     parent :
         parent widget.
     targets :
         iterable of driver object to map.
+    widget_class :
+        class used to build the page of each driver.
+        (Default value = DriverTestWidget)
     """
 
-    def __init__(self, parent, targets):
+    def __init__(self, parent, targets, widget_class=DriverTestWidget):
         super().__init__(parent)
 
+        self._widget_class = widget_class
+
+        #: List[(driver, container widget, page or None)]
+        self._pages = []
+
         layout = QtGui.QHBoxLayout(self)
 
-        tab_widget = QtGui.QTabWidget(self)
+        self.tab_widget = tab_widget = QtGui.QTabWidget(self)
         tab_widget.setTabsClosable(False)
         for target in targets:
-            widget = DriverTestWidget(parent, target)
-            tab_widget.addTab(widget, target.name)
+            container = QtGui.QWidget()
+            QtGui.QVBoxLayout(container).setContentsMargins(0, 0, 0, 0)
+            self._pages.append([target, container, None])
+            tab_widget.addTab(container, target.name)
+
+        tab_widget.currentChanged.connect(self._build_page)
+        if self._pages:
+            self._build_page(tab_widget.currentIndex())
 
         layout.addWidget(tab_widget)
+
+    def _build_page(self, index):
+        if index < 0:
+            return
+
+        entry = self._pages[index]
+        target, container, page = entry
+        if page is not None:
+            return
+
+        entry[2] = page = self._widget_class(container, target)
+        container.layout().addWidget(page)
+
+    def page(self, index):
+        """Return the page of a driver, building it if necessary.
+        """
+        self._build_page(index)
+        return self._pages[index][2]
@@ -57,6 +57,7 @@ setup(
     python_requires='>=3.6, <4',
     install_requires=[
         'pyqt5>=5.15.1',
+        'numpy',
         'lantzdev>=0.6',
     ],
     entry_points={
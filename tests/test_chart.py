@@ -0,0 +1,28 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+import pytest
+
+pytest.importorskip('pyqtgraph')
+
+from lantz.core import Q_
+
+from lantz.qt.utils.qt import QtGui
+from lantz.qt.blocks.chart import ChartUi
+
+
+APP = QtGui.QApplication.instance() or QtGui.QApplication([])
+
+
+def test_plot_sequence_of_quantities():
+    chart = ChartUi(yunits='V', curve_names=('a', 'b'))
+    chart.plot(1, [Q_(1, 'V'), Q_(500, 'mV')])
+    np.testing.assert_allclose(chart._data.view(), [[1], [1], [0.5]])
+
+
+def test_plot_many_sequence_of_quantities():
+    chart = ChartUi(yunits='V')
+    chart.plot_many([1, 2], [Q_(1, 'V'), Q_(2000, 'mV')])
+    np.testing.assert_allclose(chart._data.view(), [[1, 2], [1, 2]])
@@ -0,0 +1,34 @@
+import os
+import time
+from types import SimpleNamespace
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import numpy as np
+
+from lantz.qt.utils.qt import QtCore
+from lantz.qt.blocks.ndscan import NDScan, ScanAxis
+
+
+APP = QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def run_until_done(scan, limit=5.):
+    done = []
+    scan.loop_done.connect(done.append)
+    end = time.perf_counter() + limit
+    while not done and time.perf_counter() < end:
+        APP.processEvents(QtCore.QEventLoop.AllEvents, 10)
+    return done
+
+
+def test_interval_and_timeout():
+    stage = SimpleNamespace(x=None, y=None)
+    scan = NDScan(axes=[ScanAxis(stage, 'x', [0, 1]), ScanAxis(stage, 'y', [0, 1, 2])])
+
+    scan.start(lambda counter, index, values, overrun: sum(values),
+               interval=0.01, timeout=10)
+
+    assert run_until_done(scan) == [False]
+    np.testing.assert_array_equal(scan.results, [[0, 1, 2], [1, 2, 3]])
+    assert (stage.x, stage.y) == (1, 2)